@@ -0,0 +1,287 @@
+"""
+Forecast Accuracy
+Rolling RMSE/MAE and q10-q90 coverage per node and horizon, computed by
+the database from the stored forecasts in prediction_history joined to
+sensor_logs on node and forecast time, so every worker reports the same
+numbers across restarts. Without a database, AccuracyTracker matches the
+forecasts and readings this process has seen instead.
+"""
+
+import time
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from sensor_features import TARGET_COLUMNS
+
+# Postgres function doing the forecast/reading join (see SENSOR_LOGS_SETUP.md)
+ACCURACY_FUNCTION = 'forecast_accuracy'
+
+
+def _epoch_ns(values):
+    """Timestamps as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+class _RollingErrors:
+    """Running error sums over the matches of the last `window_ns`"""
+
+    def __init__(self, window_ns):
+        self.window_ns = window_ns
+        self.matches = deque()      # (forecast_ns, errors per target, covered)
+        self.sq = np.zeros(len(TARGET_COLUMNS))
+        self.abs = np.zeros(len(TARGET_COLUMNS))
+        self.covered = 0
+
+    def add(self, forecast_ns, errors, covered):
+        self.matches.append((forecast_ns, errors, covered))
+        self.sq += errors ** 2
+        self.abs += np.abs(errors)
+        self.covered += covered
+
+    def evict(self, now_ns):
+        while self.matches and self.matches[0][0] < now_ns - self.window_ns:
+            _, errors, covered = self.matches.popleft()
+            self.sq -= errors ** 2
+            self.abs -= np.abs(errors)
+            self.covered -= covered
+
+    def summary(self):
+        n = len(self.matches)
+        if n == 0:
+            return {'samples': 0}
+        report = {'samples': n}
+        for column, target in enumerate(TARGET_COLUMNS):
+            report[target] = {
+                'rmse': float(np.sqrt(max(self.sq[column], 0.0) / n)),
+                'mae': float(self.abs[column] / n),
+            }
+        report['temperature']['q10_q90_coverage'] = self.covered / n
+        return report
+
+
+class AccuracyTracker:
+    """
+    Incremental forecast-vs-actual evaluation
+
+    Forecasts wait per node until readings past forecast_time + tolerance
+    have arrived; then each is joined to the nearest buffered reading with
+    a searchsorted over reading times. Forecasts with no reading within the
+    tolerance are counted as unmatched. Errors feed per-(node, horizon)
+    running sums over the last `window_hours` of forecast times.
+    """
+
+    def __init__(self, tolerance_minutes=5, window_hours=24, max_pending=20000):
+        self.tolerance_ns = int(tolerance_minutes * 60e9)
+        self.window_ns = int(window_hours * 3600e9)
+        self.window_hours = window_hours
+        self.max_pending = max_pending
+        self.matched = 0
+        self.unmatched = 0
+        self._pending = {}      # node_id -> list of (forecast_ns, horizon, values)
+        self._readings = {}     # node_id -> (times ns, values (n, 3))
+        self._errors = {}       # (node_id, horizon) -> _RollingErrors
+        self._lock = threading.Lock()
+
+    def add_forecasts(self, results):
+        """
+        Register forecasts to be scored once their time has come
+
+        Args:
+            results: Dict of node_id -> list of forecast dictionaries
+        """
+        with self._lock:
+            for node_id, predictions in results.items():
+                pending = self._pending.setdefault(node_id, [])
+                for pred in predictions:
+                    values = np.array([
+                        pred['temperature']['value'], pred['humidity']['value'],
+                        pred['soil_moisture']['value'],
+                        pred['temperature']['lower_bound'], pred['temperature']['upper_bound'],
+                    ], dtype=np.float64)
+                    pending.append((int(_epoch_ns([pred['forecast_time']])[0]), pred['horizon'], values))
+                pending.sort(key=lambda item: item[0])
+                if len(pending) > self.max_pending:
+                    del pending[:len(pending) - self.max_pending]
+
+    def observe(self, node_id, rows):
+        """
+        Feed new readings for a node and score every forecast they settle
+
+        Args:
+            rows: DataFrame with created_at and the target columns
+
+        Returns:
+            Number of forecasts scored
+        """
+        if rows.empty:
+            return 0
+        times = _epoch_ns(rows['created_at'])
+        values = rows[TARGET_COLUMNS].to_numpy(dtype=np.float64)
+
+        with self._lock:
+            buffered = self._readings.get(node_id)
+            if buffered is not None:
+                times = np.concatenate([buffered[0], times])
+                values = np.concatenate([buffered[1], values])
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[order]
+
+            scored = self._score(node_id, times, values)
+
+            # Readings older than any future match can need are dropped
+            keep = times >= times[-1] - 2 * self.tolerance_ns
+            self._readings[node_id] = (times[keep], values[keep])
+        return scored
+
+    def _score(self, node_id, times, values):
+        pending = self._pending.get(node_id)
+        if not pending:
+            return 0
+
+        # Only forecasts whose whole tolerance window has been observed
+        settled_until = times[-1] - self.tolerance_ns
+        n_settled = 0
+        while n_settled < len(pending) and pending[n_settled][0] <= settled_until:
+            n_settled += 1
+        if n_settled == 0:
+            return 0
+        settled, self._pending[node_id] = pending[:n_settled], pending[n_settled:]
+
+        forecast_ns = np.array([item[0] for item in settled], dtype=np.int64)
+        forecast = np.vstack([item[2] for item in settled])
+
+        # Nearest reading: compare the neighbours on both sides of each insertion point
+        right = np.clip(np.searchsorted(times, forecast_ns), 0, len(times) - 1)
+        left = np.clip(right - 1, 0, len(times) - 1)
+        use_left = np.abs(times[left] - forecast_ns) <= np.abs(times[right] - forecast_ns)
+        nearest = np.where(use_left, left, right)
+        found = np.abs(times[nearest] - forecast_ns) <= self.tolerance_ns
+
+        actual = values[nearest]
+        errors = actual - forecast[:, :3]
+        temp = actual[:, 0]
+        covered = (temp >= forecast[:, 3]) & (temp <= forecast[:, 4])
+
+        scored = 0
+        for i, (when, horizon, _) in enumerate(settled):
+            if not found[i] or np.isnan(errors[i]).any():
+                self.unmatched += 1
+                continue
+            rolling = self._errors.get((node_id, horizon))
+            if rolling is None:
+                rolling = self._errors[(node_id, horizon)] = _RollingErrors(self.window_ns)
+            rolling.add(when, errors[i], bool(covered[i]))
+            scored += 1
+
+        newest = forecast_ns[-1]
+        for (error_node, _), rolling in self._errors.items():
+            if error_node == node_id:
+                rolling.evict(newest)
+        self.matched += scored
+        return scored
+
+    def report(self, node_id=None, horizon=None):
+        """Rolling accuracy per node and horizon"""
+        with self._lock:
+            nodes = {}
+            for (error_node, error_horizon), rolling in sorted(self._errors.items()):
+                if node_id is not None and error_node != node_id:
+                    continue
+                if horizon is not None and error_horizon != horizon:
+                    continue
+                nodes.setdefault(error_node, {})[error_horizon] = rolling.summary()
+            return {
+                'window_hours': self.window_hours,
+                'tolerance_minutes': self.tolerance_ns / 60e9,
+                'matched': self.matched,
+                'unmatched': self.unmatched,
+                'pending': sum(len(pending) for pending in self._pending.values()),
+                'nodes': nodes,
+            }
+
+
+class StoredAccuracy:
+    """
+    Accuracy of every forecast in prediction_history
+
+    The forecast_accuracy function joins each stored forecast to the
+    nearest sensor_logs reading of its node within the tolerance (a lateral
+    join on the (node_id, created_at) index) and aggregates per node,
+    horizon and target. Forecasts and readings already live in the
+    database, so add_forecasts() and observe() have nothing to do. Reports
+    are reused for `cache_seconds` so dashboard polling doesn't rerun the join.
+    """
+
+    def __init__(self, rest, tolerance_minutes=5, window_hours=24, cache_seconds=30, timeout=30.0):
+        self.rest = rest
+        self.tolerance_minutes = tolerance_minutes
+        self.window_hours = window_hours
+        self.cache_seconds = cache_seconds
+        self.timeout = timeout
+        self._reports = {}      # (node_id, horizon) -> (report, fetched at)
+        self._lock = threading.Lock()
+
+    def add_forecasts(self, results):
+        pass
+
+    def observe(self, node_id, rows):
+        return 0
+
+    def report(self, node_id=None, horizon=None):
+        """Rolling accuracy per node and horizon, in the layout of AccuracyTracker.report"""
+        key = (node_id, horizon)
+        with self._lock:
+            cached = self._reports.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.cache_seconds:
+            return cached[0]
+
+        filters = []
+        if node_id is not None:
+            filters.append(('node_id', f'eq.{node_id}'))
+        if horizon is not None:
+            filters.append(('horizon', f'eq.{horizon}'))
+        rows = self.rest.run(self.rest.rpc(ACCURACY_FUNCTION, {
+            'window_hours': self.window_hours,
+            'tolerance_minutes': self.tolerance_minutes,
+        }, filters), self.timeout)
+
+        report = accuracy_report(rows, self.window_hours, self.tolerance_minutes)
+        with self._lock:
+            self._reports[key] = (report, time.monotonic())
+        return report
+
+
+def accuracy_report(rows, window_hours, tolerance_minutes):
+    """
+    AccuracyTracker.report layout from forecast_accuracy rows
+
+    Args:
+        rows: Dicts with node_id, horizon, target, pending, samples,
+            unmatched, rmse, mae and q10_q90_coverage
+
+    Returns:
+        Report dict; match counts are per forecast (its temperature row)
+    """
+    matched = unmatched = pending = 0
+    nodes = {}
+    for row in sorted(rows, key=lambda row: (row['node_id'], row['horizon'], row['target'])):
+        if row['target'] == 'temperature':
+            matched += row['samples']
+            unmatched += row['unmatched']
+            pending += row['pending']
+        if not row['samples'] or row['target'] not in TARGET_COLUMNS:
+            continue
+        group = nodes.setdefault(row['node_id'], {}).setdefault(row['horizon'], {'samples': 0})
+        group['samples'] = max(group['samples'], row['samples'])
+        group[row['target']] = {'rmse': float(row['rmse']), 'mae': float(row['mae'])}
+        if row['target'] == 'temperature' and row['q10_q90_coverage'] is not None:
+            group['temperature']['q10_q90_coverage'] = float(row['q10_q90_coverage'])
+    return {
+        'window_hours': window_hours,
+        'tolerance_minutes': tolerance_minutes,
+        'matched': matched,
+        'unmatched': unmatched,
+        'pending': pending,
+        'nodes': nodes,
+    }
@@ -4,17 +4,31 @@ Runs predictions hourly and saves results to Supabase
 """
 
 import os
-import json
+import sys
+import atexit
 import logging
-from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
 from supabase import create_client, Client
+from accuracy_tracker import AccuracyTracker, StoredAccuracy
+from async_supabase import AsyncSensorSource, AsyncSupabaseREST
+from ingest import MicroBatchWriter, authorized, parse_payload, validate_readings
+from metrics import CONTENT_TYPE, REGISTRY, timed
 from predict_extended_horizon import ExtendedHorizonPredictor
+from prediction_trigger import PredictionTrigger
+from prediction_writer import create_prediction_writer, flatten_predictions
+from prediction_cache import ALL_HORIZONS, create_prediction_cache
+from rollups import RollupStore
+from sensor_grid import resample_window
+from sensor_sync import SensorSync
 
 # Load environment variables
 load_dotenv()
@@ -31,76 +45,288 @@ logger = logging.getLogger(__name__)
 supabase_url = os.getenv('VITE_SUPABASE_URL')
 supabase_key = os.getenv('VITE_SUPABASE_ANON_KEY')
 
+supabase_io = None
+sensor_sync = None
+ingest_writer = None
+prediction_writes = None
 if not supabase_url or not supabase_key:
     logger.error("Missing Supabase credentials in .env")
 else:
     supabase: Client = create_client(supabase_url, supabase_key)
     logger.info("✓ Supabase client initialized")
+    
+    # Pooled non-blocking REST client for reads and background writes
+    supabase_io = AsyncSupabaseREST(
+        supabase_url, supabase_key,
+        timeout=float(os.getenv('SUPABASE_TIMEOUT_SECONDS', 10)),
+        max_connections=int(os.getenv('SUPABASE_MAX_CONNECTIONS', 10)),
+        retries=int(os.getenv('SUPABASE_RETRIES', 3))
+    )
+    atexit.register(supabase_io.close)
+    
+    # Local rolling window of sensor_logs, refreshed incrementally;
+    # known nodes (SENSOR_NODE_IDS=node_1,node_2) are fetched concurrently.
+    # The window holds the 4-hour lookback plus the current slot, with an
+    # hour to spare for short gaps the grid fills
+    sensor_sync = SensorSync(
+        AsyncSensorSource(supabase_io, node_ids=[
+            node_id for node_id in os.getenv('SENSOR_NODE_IDS', '').split(',') if node_id
+        ]),
+        window_hours=int(os.getenv('SENSOR_WINDOW_HOURS', 5))
+    )
+    
+    # Predictions are upserted in the background, off the request path,
+    # and spooled locally while the database is unreachable
+    prediction_writes = create_prediction_writer(
+        supabase_io, os.getenv('PREDICTION_SPOOL_PATH', 'prediction_spool.jsonl')
+    )
+    atexit.register(prediction_writes.close)
+    
+    # Readings pushed to /ingest are written in bulk, one insert per batch
+    ingest_writer = MicroBatchWriter(
+        supabase,
+        batch_size=int(os.getenv('INGEST_BATCH_SIZE', 200)),
+        flush_interval=float(os.getenv('INGEST_FLUSH_SECONDS', 2))
+    )
+    atexit.register(ingest_writer.close)
+sync_lock = threading.Lock()
 
 # Initialize predictor
 try:
-    predictor = ExtendedHorizonPredictor('extended_horizon_models.pkl')
+    predictor = ExtendedHorizonPredictor(
+        os.getenv('MODEL_PATH', 'extended_horizon_models.pkl'),
+        backend=os.getenv('INFERENCE_BACKEND', 'xgboost')
+    )
     logger.info("✓ ML model loaded successfully")
+    # Under gunicorn --preload this runs in the master before it forks, so
+    # the parsed boosters are shared copy-on-write instead of every worker
+    # parsing its own copy on first use. Nothing else here may start a
+    # thread or hold a connection at import: the Supabase I/O loop, write
+    # queues, ingest flusher and prediction trigger start on first use,
+    # inside the worker
+    if predictor.ready and os.getenv(
+        'PRELOAD_MODELS', str('gunicorn' in sys.modules)
+    ).lower() == 'true':
+        predictor.preload()
+        logger.info("✓ Preloaded every horizon")
 except Exception as e:
     logger.error(f"Failed to load ML model: {e}")
     predictor = None
 
-# Global state
-last_prediction = None
-last_prediction_time = None
+# Shared secret sensor nodes send as "Authorization: Bearer <token>" to /ingest;
+# /ingest rejects every request while it is unset
+INGEST_TOKEN = os.getenv('INGEST_TOKEN')
+
+# Prediction settings
+HORIZONS = ['1h', '4h', '6h', '12h']
+MIN_ROWS_FOR_PREDICTION = 12
+
+# Windows are resampled to the 5-minute grid train_extended_horizon.py trains
+# on; set SERVING_GRID=false for models trained with --no-resample
+SERVING_GRID = os.getenv('SERVING_GRID', 'true').lower() == 'true'
+MAX_FILL_STEPS = int(os.getenv('MAX_FILL_STEPS', 2))
+PREDICTION_WORKERS = int(os.getenv('PREDICTION_WORKERS', 4))
+
+# 'interval' predicts every node hourly; 'event' refreshes a node when it has new readings
+PREDICTION_MODE = os.getenv('PREDICTION_MODE', 'interval')
+SENSOR_POLL_SECONDS = int(os.getenv('SENSOR_POLL_SECONDS', 60))
+
+# Bounded pool shared by the scheduler and /predict-now
+prediction_pool = ThreadPoolExecutor(max_workers=PREDICTION_WORKERS, thread_name_prefix='predict')
+
+# Latest predictions, shared by every worker and stored pre-serialized
+prediction_cache = create_prediction_cache(
+    os.getenv('PREDICTION_CACHE_PATH', 'prediction_cache.sqlite3'),
+    ttl=int(os.getenv('PREDICTION_CACHE_TTL', 7200))
+)
+
+
+# Forecast-vs-actual accuracy, joined in the database from the stored
+# forecasts so every worker agrees; scored in-process without a database
+accuracy_settings = {
+    'tolerance_minutes': float(os.getenv('ACCURACY_TOLERANCE_MINUTES', 5)),
+    'window_hours': float(os.getenv('ACCURACY_WINDOW_HOURS', 24)),
+}
+if supabase_io is not None:
+    accuracy_tracker = StoredAccuracy(supabase_io, **accuracy_settings)
+else:
+    accuracy_tracker = AccuracyTracker(**accuracy_settings)
 
 
-def fetch_recent_sensor_data(hours=4):
-    """Fetch recent sensor data from Supabase for predictions"""
+# Chart rollups and downsampled series, folded in as readings arrive. They
+# are per process; ROLLUP_SEED=true backfills the last ROLLUP_SEED_DAYS of
+# the local history (sensor_store/ or sensor_logs.csv) before serving
+rollup_store = RollupStore()
+if os.getenv('ROLLUP_SEED', 'false').lower() == 'true':
     try:
-        threshold = datetime.utcnow() - timedelta(hours=hours)
-        threshold_iso = threshold.isoformat()
+        from sensor_store import load_sensor_logs
+        seeded = rollup_store.backfill(
+            load_sensor_logs(), days=float(os.getenv('ROLLUP_SEED_DAYS', 31))
+        )
+        logger.info(f"✓ Backfilled rollups with {seeded} historical records")
+    except Exception as e:
+        logger.error(f"Failed to backfill rollups: {e}")
+
+
+def fetch_recent_sensor_data(node_ids=None):
+    """
+    Bring the local sensor windows up to date and return them
+    
+    Only rows newer than the last synced id are fetched; new readings are
+    also fed into the accuracy tracker and rollups.
+    
+    Returns:
+        Dict of node_id -> SensorWindow for all (or the given) nodes, or None
+    """
+    try:
+        with timed('fetch'), sync_lock:
+            added = sensor_sync.sync()
+            frames = sensor_sync.frames(node_ids)
         
-        response = supabase.table('sensor_logs').select('*').gte(
-            'created_at', threshold_iso
-        ).order('created_at', desc=False).execute()
+        observe_readings(added)
         
-        if not response.data:
+        if not frames:
             logger.warning("No sensor data found for predictions")
             return None
         
-        df = pd.DataFrame(response.data)
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        
-        logger.info(f"✓ Fetched {len(df)} sensor records for prediction")
-        return df
+        new_rows = sum(len(rows) for rows in added.values())
+        logger.info(f"✓ Synced {new_rows} new sensor records ({len(frames)} node window(s))")
+        return frames
     except Exception as e:
         logger.error(f"Error fetching sensor data: {e}")
         return None
 
 
-def save_predictions_to_db(predictions, node_id='node_1'):
-    """Save predictions to Supabase"""
+def observe_readings(added):
+    """Feed new rows (node_id -> DataFrame) into the accuracy tracker and rollups"""
+    for node_id, rows in added.items():
+        accuracy_tracker.observe(node_id, rows)
+        rollup_store.add(node_id, rows)
+
+
+def ingest_readings(readings):
+    """
+    Add validated readings to the local windows and queue new ones for the database
+    
+    Returns:
+        Dict of node_id -> DataFrame of readings that were new
+    """
+    if sensor_sync is not None:
+        with sync_lock:
+            added = sensor_sync.ingest(readings)
+    else:
+        added = {
+            node_id: rows.sort_values('created_at').reset_index(drop=True)
+            for node_id, rows in readings.groupby('node_id', sort=True)
+        }
+    
+    observe_readings(added)
+    if ingest_writer is not None and added:
+        # Readings already in the window were sent before; don't insert them twice
+        ingest_writer.submit(pd.concat(added.values(), ignore_index=True))
+    if prediction_trigger is not None and added:
+        prediction_trigger.notify(list(added))
+    return added
+
+
+def predict_nodes(node_frames):
+    """
+    Run predictions for every node concurrently on the bounded worker pool
+    
+    Windows are first put on the training grid (unless SERVING_GRID is
+    off), then nodes are split into one chunk per worker and each chunk is
+    evaluated with a single batched predictor call.
+    
+    Returns:
+        Dict of node_id -> list of forecast dictionaries
+    """
+    eligible = {}
+    for node_id, node_df in node_frames.items():
+        if SERVING_GRID and len(node_df):
+            node_df = resample_window(node_df, node_id, MAX_FILL_STEPS)
+            if node_df is None:
+                logger.warning(f"No full gap-free lookback on the grid for {node_id}, skipping")
+                continue
+        if len(node_df) < MIN_ROWS_FOR_PREDICTION:
+            logger.warning(f"Insufficient data for prediction on {node_id}")
+        else:
+            eligible[node_id] = node_df
+    
+    if not eligible:
+        return {}
+    
+    node_ids = list(eligible)
+    chunk_size = -(-len(node_ids) // PREDICTION_WORKERS)
+    futures = [
+        prediction_pool.submit(
+            predictor.predict_batch,
+            {node_id: eligible[node_id] for node_id in node_ids[i:i + chunk_size]},
+            HORIZONS
+        )
+        for i in range(0, len(node_ids), chunk_size)
+    ]
+    
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    return {node_id: predictions for node_id, predictions in results.items() if predictions}
+
+
+def store_predictions(results, prediction_time):
+    """Serialize each node's responses once, publish them to the shared cache and track their accuracy"""
+    prediction_time_iso = prediction_time.isoformat()
+    for node_id, predictions in results.items():
+        bodies = {
+            ALL_HORIZONS: app.json.dumps({
+                'status': 'success',
+                'node_id': node_id,
+                'prediction_time': prediction_time_iso,
+                'predictions': predictions
+            })
+        }
+        for pred in predictions:
+            bodies[pred['horizon']] = app.json.dumps({
+                'status': 'success',
+                'node_id': node_id,
+                'prediction_time': prediction_time_iso,
+                'prediction': pred
+            })
+        prediction_cache.put(node_id, bodies, prediction_time_iso)
+    accuracy_tracker.add_forecasts(results)
+
+
+def cached_response(entry):
+    """Serve a pre-serialized cache entry without re-encoding it"""
+    response = app.response_class(entry.body, status=200, mimetype='application/json')
+    response.headers['X-Prediction-Version'] = str(entry.version)
+    return response
+
+
+def save_all_predictions(results, prediction_time=None):
+    """Queue every node's predictions for one bulk upsert into prediction_history"""
     try:
-        if not predictions:
+        if not results:
             logger.warning("No predictions to save")
             return False
+        if prediction_writes is None:
+            logger.warning("No database configured, predictions not saved")
+            return False
         
-        prediction_record = {
-            'node_id': node_id,
-            'prediction_time': datetime.utcnow().isoformat(),
-            'predictions': json.dumps(predictions),
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        response = supabase.table('predictions').insert(prediction_record).execute()
-        
-        logger.info(f"✓ Predictions saved to database")
+        rows = flatten_predictions(results, prediction_time or datetime.utcnow())
+        prediction_writes.submit(rows)
         return True
     except Exception as e:
         logger.error(f"Error saving predictions: {e}")
         return False
 
 
+def save_predictions_to_db(predictions, node_id='node_1'):
+    """Queue one node's predictions for saving to Supabase"""
+    return save_all_predictions({node_id: predictions} if predictions else {})
+
+
 def run_hourly_prediction():
-    """Run predictions every hour"""
-    global last_prediction, last_prediction_time
-    
+    """Run predictions for every active node every hour"""
     try:
         if not predictor or not predictor.ready:
             logger.error("Predictor not ready")
@@ -108,30 +334,99 @@ def run_hourly_prediction():
         
         logger.info("🔄 Running hourly prediction task...")
         
-        df = fetch_recent_sensor_data(hours=4)
-        if df is None or len(df) < 12:
-            logger.warning("Insufficient data for prediction")
-            return
+        with timed('job'):
+            frames = fetch_recent_sensor_data()
+            if frames is None:
+                logger.warning("Insufficient data for prediction")
+                return
+            
+            results = predict_nodes(frames)
+            
+            if not results:
+                logger.error("Prediction failed")
+                return
+            
+            prediction_time = datetime.utcnow()
+            store_predictions(results, prediction_time)
+            save_all_predictions(results, prediction_time)
         
-        predictions = predictor.predict_sequence(
-            df,
-            horizons_list=['1h', '4h', '6h', '12h'],
-            node_id='node_1'
-        )
+        logger.info(f"✓ Prediction task completed successfully for {len(results)} node(s)")
         
-        if not predictions:
-            logger.error("Prediction failed")
+    except Exception as e:
+        logger.error(f"Error in prediction task: {e}")
+
+
+def run_triggered_prediction(node_ids):
+    """Refresh forecasts for nodes with new readings, from the local windows"""
+    if not predictor or not predictor.ready or sensor_sync is None:
+        return
+    
+    with timed('job'):
+        with sync_lock:
+            frames = sensor_sync.frames(node_ids)
+        results = predict_nodes(frames)
+        if not results:
             return
         
-        last_prediction = predictions
-        last_prediction_time = datetime.utcnow()
-        
-        save_predictions_to_db(predictions, 'node_1')
-        
-        logger.info("✓ Prediction task completed successfully")
-        
+        prediction_time = datetime.utcnow()
+        store_predictions(results, prediction_time)
+        save_all_predictions(results, prediction_time)
+    
+    logger.info(f"✓ Triggered prediction completed for {', '.join(results)}")
+
+
+def poll_sensor_data():
+    """Pick up readings written straight to sensor_logs and trigger their nodes"""
+    try:
+        with timed('fetch'), sync_lock:
+            added = sensor_sync.sync()
+        observe_readings(added)
+        if added:
+            prediction_trigger.notify(list(added))
     except Exception as e:
-        logger.error(f"Error in prediction task: {e}")
+        logger.error(f"Error polling sensor data: {e}")
+
+
+# Debounced per-node refreshes in event mode
+prediction_trigger = None
+if PREDICTION_MODE == 'event':
+    prediction_trigger = PredictionTrigger(
+        run_triggered_prediction,
+        debounce=float(os.getenv('TRIGGER_DEBOUNCE_SECONDS', 20)),
+        max_wait=float(os.getenv('TRIGGER_MAX_WAIT_SECONDS', 120)),
+        min_interval=float(os.getenv('TRIGGER_MIN_INTERVAL_SECONDS', 60))
+    )
+
+
+# Per-endpoint request latency
+request_seconds = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['endpoint', 'method']
+)
+request_total = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests served', ['endpoint', 'method', 'status']
+)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Route pattern rather than the raw path keeps label cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        request_seconds.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+        request_total.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and prediction stage latencies in Prometheus text format"""
+    return app.response_class(REGISTRY.render(), status=200, content_type=CONTENT_TYPE)
 
 
 @app.route('/health', methods=['GET'])
@@ -146,75 +441,172 @@ def health_check():
 
 @app.route('/predict', methods=['GET'])
 def get_latest_prediction():
-    """Get latest prediction"""
-    if last_prediction is None:
+    """Get latest prediction for a node (?node_id=, default node_1)"""
+    node_id = request.args.get('node_id', 'node_1')
+    entry = prediction_cache.get(node_id, ALL_HORIZONS)
+    if entry is None:
         return jsonify({
             'status': 'no_prediction',
-            'message': 'No predictions available yet'
+            'message': f'No predictions available yet for {node_id}'
         }), 404
     
-    return jsonify({
-        'status': 'success',
-        'prediction_time': last_prediction_time.isoformat(),
-        'predictions': last_prediction
-    }), 200
+    return cached_response(entry)
 
 
 @app.route('/predict-now', methods=['POST'])
 def predict_now():
-    """Trigger prediction immediately"""
+    """Trigger prediction immediately (?node_id= to limit to one node)"""
     try:
         if not predictor or not predictor.ready:
             return jsonify({'error': 'Predictor not ready'}), 500
         
-        df = fetch_recent_sensor_data(hours=4)
-        if df is None or len(df) < 12:
+        node_id = request.args.get('node_id')
+        frames = fetch_recent_sensor_data(node_ids=[node_id] if node_id else None)
+        if frames is None:
             return jsonify({'error': 'Insufficient sensor data'}), 400
         
-        predictions = predictor.predict_sequence(
-            df,
-            horizons_list=['1h', '4h', '6h', '12h'],
-            node_id='node_1'
-        )
+        results = predict_nodes(frames)
+        if not results or (node_id and node_id not in results):
+            return jsonify({'error': 'Insufficient sensor data'}), 400
         
-        save_predictions_to_db(predictions, 'node_1')
+        prediction_time = datetime.utcnow()
+        store_predictions(results, prediction_time)
+        save_all_predictions(results, prediction_time)
+        
+        if node_id:
+            return jsonify({
+                'status': 'success',
+                'node_id': node_id,
+                'prediction_time': prediction_time.isoformat(),
+                'predictions': results[node_id]
+            }), 200
         
         return jsonify({
             'status': 'success',
-            'prediction_time': datetime.utcnow().isoformat(),
-            'predictions': predictions
+            'prediction_time': prediction_time.isoformat(),
+            'nodes': results
         }), 200
     except Exception as e:
         logger.error(f"Error in predict_now: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/ingest', methods=['POST'])
+def ingest():
+    """Accept one or more sensor readings (JSON or CSV) for sensor_logs"""
+    if not authorized(request.headers.get('Authorization'), INGEST_TOKEN):
+        return jsonify({'error': 'Missing or invalid ingest token'}), 401
+    
+    try:
+        raw_readings = parse_payload(request.get_data(), request.mimetype)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    readings, rejected = validate_readings(raw_readings)
+    if readings.empty:
+        return jsonify({'error': 'No valid readings', 'rejected': rejected}), 400
+    
+    try:
+        added = ingest_readings(readings)
+    except Exception as e:
+        logger.error(f"Error in ingest: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'status': 'accepted',
+        'accepted': len(readings),
+        'new': sum(len(rows) for rows in added.values()),
+        'rejected': rejected,
+        'queued_for_database': ingest_writer is not None
+    }), 202
+
+
 @app.route('/predictions/<horizon>', methods=['GET'])
 def get_prediction_by_horizon(horizon):
-    """Get prediction for specific horizon (1h, 4h, 6h, 12h)"""
-    if last_prediction is None:
+    """Get prediction for specific horizon (1h, 4h, 6h, 12h) and node (?node_id=)"""
+    node_id = request.args.get('node_id', 'node_1')
+    if prediction_cache.get(node_id, ALL_HORIZONS) is None:
         return jsonify({'error': 'No predictions available'}), 404
     
-    for pred in last_prediction:
-        if pred['horizon'] == horizon:
-            return jsonify({
-                'status': 'success',
-                'prediction_time': last_prediction_time.isoformat(),
-                'prediction': pred
-            }), 200
+    entry = prediction_cache.get(node_id, horizon)
+    if entry is None:
+        return jsonify({'error': f'Horizon {horizon} not found'}), 404
+    
+    return cached_response(entry)
+
+
+@app.route('/accuracy', methods=['GET'])
+def get_accuracy():
+    """Rolling forecast accuracy per node and horizon (?node_id=, ?horizon= to filter)"""
+    try:
+        report = accuracy_tracker.report(request.args.get('node_id'), request.args.get('horizon'))
+    except Exception as e:
+        logger.error(f"Error computing accuracy: {e}")
+        return jsonify({'error': str(e)}), 500
+    return jsonify(dict(report, status='success')), 200
+
+
+@app.route('/rollups', methods=['GET'])
+def get_rollups():
+    """min/mean/max buckets for a node (?node_id=, resolution=5m|1h|1d, start=, end=)"""
+    node_id = request.args.get('node_id', 'node_1')
+    resolution = request.args.get('resolution', '1h')
+    try:
+        buckets = rollup_store.rollups(
+            node_id, resolution, request.args.get('start'), request.args.get('end')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if buckets is None:
+        return jsonify({'error': f'No sensor data for {node_id}'}), 404
+    
+    return jsonify({
+        'status': 'success',
+        'node_id': node_id,
+        'resolution': resolution,
+        'buckets': buckets
+    }), 200
+
+
+@app.route('/series', methods=['GET'])
+def get_series():
+    """Downsampled series of one metric (?node_id=, metric=, start=, end=, points=)"""
+    node_id = request.args.get('node_id', 'node_1')
+    metric = request.args.get('metric', 'temperature')
+    try:
+        points = min(max(int(request.args.get('points', 500)), 3), 5000)
+        series = rollup_store.series(
+            node_id, metric, request.args.get('start'), request.args.get('end'), points
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if series is None:
+        return jsonify({'error': f'No sensor data for {node_id}'}), 404
     
-    return jsonify({'error': f'Horizon {horizon} not found'}), 404
+    source, values = series
+    return jsonify({
+        'status': 'success',
+        'node_id': node_id,
+        'metric': metric,
+        'source': source,
+        'points': values
+    }), 200
 
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Get API statistics"""
+    prediction_times = prediction_cache.nodes()
     return jsonify({
         'status': 'success',
-        'last_prediction_time': last_prediction_time.isoformat() if last_prediction_time else None,
+        'last_prediction_time': max(prediction_times.values()) if prediction_times else None,
+        'node_prediction_times': prediction_times,
         'predictor_ready': predictor.ready if predictor else False,
-        'supported_horizons': ['1h', '4h', '6h', '12h'],
-        'update_interval': 'Every hour'
+        'supported_horizons': HORIZONS,
+        'prediction_workers': PREDICTION_WORKERS,
+        'prediction_mode': PREDICTION_MODE,
+        'sensor_window_bytes': sensor_sync.nbytes if sensor_sync is not None else 0,
+        'update_interval': 'On new sensor data' if prediction_trigger is not None else 'Every hour'
     }), 200
 
 
@@ -230,17 +622,28 @@ def internal_error(error):
 
 
 def start_scheduler():
-    """Start background scheduler for hourly predictions"""
+    """Start background scheduler for hourly (or data-triggered) predictions"""
     scheduler = BackgroundScheduler()
     
-    scheduler.add_job(
-        func=run_hourly_prediction,
-        trigger='interval',
-        hours=1,
-        id='hourly_prediction',
-        name='Hourly ML Prediction',
-        replace_existing=True
-    )
+    if prediction_trigger is not None and sensor_sync is not None:
+        # New readings trigger predictions; only the table needs polling
+        scheduler.add_job(
+            func=poll_sensor_data,
+            trigger='interval',
+            seconds=SENSOR_POLL_SECONDS,
+            id='sensor_poll',
+            name='Sensor Poll',
+            replace_existing=True
+        )
+    else:
+        scheduler.add_job(
+            func=run_hourly_prediction,
+            trigger='interval',
+            hours=1,
+            id='hourly_prediction',
+            name='Hourly ML Prediction',
+            replace_existing=True
+        )
     
     scheduler.add_job(
         func=run_hourly_prediction,
@@ -251,7 +654,10 @@ def start_scheduler():
     )
     
     scheduler.start()
-    logger.info("✓ Scheduler started - Predictions will run hourly")
+    if prediction_trigger is not None:
+        logger.info("✓ Scheduler started - Predictions follow new sensor data")
+    else:
+        logger.info("✓ Scheduler started - Predictions will run hourly")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,270 @@
+"""
+Async Supabase Access
+Non-blocking PostgREST client on a pooled httpx connection, run on a
+background event loop so Flask handlers and scheduler jobs can fetch
+several nodes concurrently and hand writes to a background queue
+"""
+
+import random
+import asyncio
+import logging
+import threading
+import httpx
+from metrics import timed
+from sensor_sync import SENSOR_COLUMNS, _sensor_frame
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class AsyncSupabaseREST:
+    """
+    PostgREST client for the Supabase REST API
+
+    One AsyncClient (and its connection pool) lives on a dedicated event
+    loop thread; synchronous callers submit coroutines with run(). The loop
+    thread and pool are started on first use, so an instance created before
+    a fork (gunicorn --preload) starts them in the worker that uses it.
+    Failed requests are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(self, url, key, timeout=10.0, connect_timeout=5.0, max_connections=10,
+                 retries=3, backoff=0.25):
+        self.url = url
+        self.key = key
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.loop = None
+        self.client = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _started_loop(self):
+        """The I/O loop, starting it and the connection pool if needed"""
+        if self.loop is None:
+            with self._start_lock:
+                if self.loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name='supabase-io', daemon=True)
+                    thread.start()
+
+                    async def make_client():
+                        return httpx.AsyncClient(
+                            base_url=f"{self.url.rstrip('/')}/rest/v1",
+                            headers={'apikey': self.key, 'Authorization': f'Bearer {self.key}'},
+                            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                            limits=httpx.Limits(max_connections=self.max_connections,
+                                                max_keepalive_connections=self.max_connections),
+                        )
+                    self.client = asyncio.run_coroutine_threadsafe(make_client(), loop).result()
+                    self._thread = thread
+                    self.loop = loop
+        return self.loop
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the I/O loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._started_loop()).result(timeout)
+
+    def submit(self, coro):
+        """Schedule a coroutine on the I/O loop without waiting"""
+        return asyncio.run_coroutine_threadsafe(coro, self._started_loop())
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the I/O loop without waiting"""
+        self._started_loop().call_soon_threadsafe(callback, *args)
+
+    async def request(self, method, path, **kwargs):
+        """HTTP request with retry on transport errors and retryable statuses"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    response.raise_for_status()
+                    return response
+                reason = f'HTTP {response.status_code}'
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise
+                reason = type(e).__name__
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            logger.warning(f"{method} {path} failed ({reason}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def select(self, table, columns='*', filters=None, order=None, limit=None):
+        """
+        Rows of a table
+
+        Args:
+            filters: List of (column, PostgREST operator expression) pairs,
+                e.g. [('id', 'gt.10'), ('node_id', 'in.(node_1,node_2)')]
+        """
+        params = [('select', columns)] + list(filters or [])
+        if order:
+            params.append(('order', order))
+        if limit:
+            params.append(('limit', str(limit)))
+        response = await self.request('GET', f'/{table}', params=params)
+        return response.json()
+
+    async def rpc(self, function, args=None, filters=None):
+        """
+        Rows returned by a Postgres function exposed through PostgREST
+
+        Args:
+            filters: (column, operator expression) pairs applied to the result
+        """
+        response = await self.request('POST', f'/rpc/{function}', params=list(filters or []),
+                                      json=args or {})
+        return response.json()
+
+    async def insert(self, table, rows, on_conflict=None):
+        """Bulk insert (or upsert on `on_conflict` columns) without returning the rows"""
+        params, prefer = {}, ['return=minimal']
+        if on_conflict:
+            params['on_conflict'] = on_conflict
+            prefer.append('resolution=merge-duplicates')
+        await self.request('POST', f'/{table}', params=params, json=rows,
+                           headers={'Prefer': ','.join(prefer)})
+
+    def close(self):
+        if self.loop is None:
+            return
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+class AsyncSensorSource:
+    """
+    sensor_logs source for SensorSync on the async client
+
+    With known node ids, every node is paged in its own concurrent
+    request chain instead of one after another.
+    """
+
+    def __init__(self, rest, table='sensor_logs', page_size=1000, node_ids=None, timeout=60.0):
+        self.rest = rest
+        self.table = table
+        self.page_size = page_size
+        self.node_ids = list(node_ids) if node_ids else None
+        self.timeout = timeout
+
+    async def _fetch_pages(self, after_id, since, node_ids):
+        rows = []
+        while True:
+            filters = []
+            if after_id is not None:
+                filters.append(('id', f'gt.{after_id}'))
+            if since is not None:
+                filters.append(('created_at', f'gte.{since.isoformat()}'))
+            if node_ids:
+                filters.append(('node_id', f"in.({','.join(node_ids)})"))
+            page = await self.rest.select(self.table, ','.join(SENSOR_COLUMNS), filters,
+                                          order='id.asc', limit=self.page_size)
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            after_id = page[-1]['id']
+
+    async def fetch_async(self, after_id=None, since=None, node_ids=None):
+        node_ids = node_ids or self.node_ids
+        if not node_ids or len(node_ids) == 1:
+            return await self._fetch_pages(after_id, since, node_ids)
+        pages = await asyncio.gather(*[
+            self._fetch_pages(after_id, since, [node_id]) for node_id in node_ids
+        ])
+        rows = [row for node_rows in pages for row in node_rows]
+        return sorted(rows, key=lambda row: row['id'])
+
+    def fetch(self, after_id=None, since=None, node_ids=None):
+        """Same contract as SupabaseSensorSource.fetch"""
+        return _sensor_frame(self.rest.run(self.fetch_async(after_id, since, node_ids), self.timeout))
+
+
+class AsyncWriteQueue:
+    """
+    Fire-and-forget background writes
+
+    submit() only enqueues rows on the I/O loop; a consumer task drains the
+    queue and writes up to `batch_size` rows per request. The queue and
+    consumer are created with the first submit(). The queue is bounded:
+    when it is full, new rows are dropped and counted.
+    """
+
+    def __init__(self, rest, table, batch_size=100, max_size=10000, on_conflict=None):
+        self.rest = rest
+        self.table = table
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.on_conflict = on_conflict
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.queue = None
+        self._consumer = None
+
+    def submit(self, rows):
+        """Queue rows for writing and return immediately"""
+        self.rest.call_soon(self._put, list(rows))
+
+    def _start(self):
+        """Create the queue and its consumer; runs on the I/O loop"""
+        self.queue = asyncio.Queue(self.max_size)
+        self._consumer = asyncio.ensure_future(self._consume())
+
+    def _put(self, rows):
+        if self.queue is None:
+            self._start()
+        for row in rows:
+            try:
+                self.queue.put_nowait(row)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                logger.warning(f"{self.table} write queue full, dropping row")
+
+    async def write(self, batch):
+        """Write one batch; subclasses may add failure handling"""
+        with timed('save'):
+            await self.rest.insert(self.table, batch, self.on_conflict)
+
+    async def _consume(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.write(batch)
+                self.written += len(batch)
+                logger.info(f"✓ Wrote {len(batch)} row(s) to {self.table}")
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Error writing {len(batch)} row(s) to {self.table}: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _join(self):
+        # Runs after any _put() scheduled before it, so the queue exists by now
+        if self.queue is not None:
+            await self.queue.join()
+
+    def join(self, timeout=None):
+        """Wait until everything queued so far has been written (or failed)"""
+        if self.rest.loop is not None:
+            self.rest.run(self._join(), timeout)
+
+    def close(self, timeout=10.0):
+        """Write what is queued, then stop the consumer"""
+        if self.rest.loop is None:
+            return
+        try:
+            self.join(timeout)
+        except TimeoutError:
+            logger.warning(f"{self.queue.qsize()} {self.table} row(s) still queued at shutdown")
+        if self._consumer is not None:
+            self.rest.call_soon(self._consumer.cancel)
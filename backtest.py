@@ -0,0 +1,231 @@
+"""
+Walk-Forward Backtest
+Rolling-origin evaluation of the XGBoost forecasters across every fold,
+horizon and node, spread over a process pool
+
+Usage:
+    python backtest.py --folds 5 --horizons 1h 4h 6h 12h --output backtest_report.json
+"""
+
+import json
+import argparse
+import tempfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import TimeSeriesSplit
+from sensor_features import HORIZON_STEPS
+from sensor_store import load_sensor_logs
+from sensor_grid import describe_grid, resample_to_grid, valid_rows
+from feature_cache import DEFAULT_CACHE_DIR, entry_paths, node_entry
+from train_extended_horizon import XGB_PARAMS, fit_model
+
+TARGETS = {
+    'temperature': 'temp',
+    'humidity': 'hum',
+    'soil_moisture': 'soil',
+}
+
+
+def regression_metrics(y_true, y_pred, mape_offset=0.0):
+    """RMSE, MAE, MAPE (%) and R² for one target"""
+    errors = y_true - y_pred
+    ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mape': float(np.mean(np.abs(errors / (y_true + mape_offset))) * 100),
+        'r2': float(1 - np.sum(errors ** 2) / ss_tot) if ss_tot > 0 else float('nan'),
+    }
+
+
+def cache_node_features(df, node_ids, cache_dir):
+    """
+    Build each node's feature matrix once (or reuse the cached one) for the workers
+
+    Returns:
+        Dict of node_id -> (features_path, targets_path, flags_path)
+    """
+    paths = {}
+    for node_id in node_ids:
+        node_df = df[df['node_id'] == node_id].reset_index(drop=True)
+        entry_dir, _ = node_entry(node_df, node_id, cache_dir)
+        features_path, targets_path, _, flags_path = entry_paths(entry_dir)
+        paths[node_id] = (features_path, targets_path, flags_path)
+    return paths
+
+
+def horizon_rows(flags, horizon_steps):
+    """Gap-free feature rows with full lookback whose target `horizon_steps` ahead is a real reading"""
+    return valid_rows(flags, horizon_steps, observed_targets=True)
+
+
+def evaluate_fold(task):
+    """
+    Train on one fold's history and score its test window
+
+    Args:
+        task: (node_id, horizon, steps, fold, train_idx, test_idx,
+               features_path, targets_path, flags_path)
+
+    Returns:
+        Dict with the fold's metrics
+    """
+    node_id, horizon, steps, fold, train_idx, test_idx, features_path, targets_path, flags_path = task
+    features = np.load(features_path, mmap_mode='r')
+    targets = np.load(targets_path, mmap_mode='r')
+
+    rows = horizon_rows(np.load(flags_path), steps)
+    X = np.asarray(features[rows])
+    y = np.asarray(targets[rows + steps])
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_test = scaler.transform(X[test_idx])
+
+    result = {
+        'node_id': node_id,
+        'horizon': horizon,
+        'fold': fold,
+        'train_samples': int(len(train_idx)),
+        'test_samples': int(len(test_idx)),
+    }
+
+    for column, (target, short) in enumerate(TARGETS.items()):
+        model = fit_model(X_train, y[train_idx, column], dict(XGB_PARAMS, n_jobs=1))
+        y_pred = model.predict(X_test)
+        # Same MAPE guard as the visualization scripts
+        offset = 0.0 if short == 'temp' else 0.001
+        result[target] = regression_metrics(y[test_idx, column], y_pred, offset)
+
+    # Temperature uncertainty band
+    bounds = []
+    for alpha in (0.1, 0.9):
+        model = fit_model(X_train, y[train_idx, 0], dict(XGB_PARAMS, n_jobs=1), alpha)
+        bounds.append(model.predict(X_test))
+    y_temp = y[test_idx, 0]
+    result['temperature']['q10_q90_coverage'] = float(
+        np.mean((y_temp >= bounds[0]) & (y_temp <= bounds[1]))
+    )
+    result['temperature']['mean_interval_width'] = float(np.mean(bounds[1] - bounds[0]))
+
+    return result
+
+
+def summarize(fold_results):
+    """Average fold metrics per node and horizon"""
+    summary = {}
+    for result in fold_results:
+        key = (result['node_id'], result['horizon'])
+        summary.setdefault(key, []).append(result)
+
+    report = {}
+    for (node_id, horizon), folds in summary.items():
+        entry = {
+            'folds': len(folds),
+            'test_samples': int(sum(f['test_samples'] for f in folds)),
+        }
+        for target in TARGETS:
+            metrics = folds[0][target].keys()
+            entry[target] = {
+                metric: float(np.mean([f[target][metric] for f in folds])) for metric in metrics
+            }
+        report.setdefault(node_id, {})[horizon] = entry
+    return report
+
+
+def run_backtest(df, horizons, node_ids, n_folds=5, workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Rolling-origin evaluation over all folds, horizons and nodes
+
+    Args:
+        df: Sensor DataFrame sorted by node_id and created_at
+        horizons: Dict of horizon -> forecast steps
+        node_ids: Nodes to evaluate
+        n_folds: Number of expanding-window folds per series
+        workers: Process pool size (default: CPU count)
+        cache_dir: Feature cache directory (None: a temporary one)
+
+    Returns:
+        Report dict with per-node/per-horizon summaries and per-fold detail
+    """
+    with tempfile.TemporaryDirectory(prefix='backtest_') as tmp_dir:
+        paths = cache_node_features(df, node_ids, cache_dir or tmp_dir)
+
+        tasks = []
+        for node_id, (features_path, targets_path, flags_path) in paths.items():
+            flags = np.load(flags_path)
+            for horizon, steps in horizons.items():
+                n_samples = len(horizon_rows(flags, steps))
+                if n_samples // (n_folds + 1) <= steps:
+                    print(f"  Skipping {node_id} {horizon}: only {n_samples} samples")
+                    continue
+                # The last `steps` rows before each test window have their
+                # targets inside it; leave them out of training
+                splits = TimeSeriesSplit(n_splits=n_folds, gap=steps).split(np.arange(n_samples))
+                for fold, (train_idx, test_idx) in enumerate(splits):
+                    tasks.append((node_id, horizon, steps, fold, train_idx, test_idx,
+                                  features_path, targets_path, flags_path))
+
+        print(f"  Evaluating {len(tasks)} fold(s)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fold_results = list(pool.map(evaluate_fold, tasks))
+
+    return {
+        'generated_at': datetime.utcnow().isoformat(),
+        'n_folds': n_folds,
+        'horizons': horizons,
+        'nodes': list(node_ids),
+        'xgb_params': XGB_PARAMS,
+        'summary': summarize(fold_results),
+        'folds': fold_results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the extended horizon models')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--horizons', nargs='+', default=list(HORIZON_STEPS))
+    parser.add_argument('--nodes', nargs='+', default=None)
+    parser.add_argument('--months', nargs='+', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='backtest_report.json')
+    parser.add_argument('--feature-cache', default=DEFAULT_CACHE_DIR,
+                        help="feature cache directory ('' for a temporary one)")
+    parser.add_argument('--max-fill-steps', type=int, default=2,
+                        help='longest run of missing 5-minute slots to interpolate')
+    parser.add_argument('--no-resample', action='store_true',
+                        help='evaluate on the raw readings instead of the 5-minute grid')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("WALK-FORWARD BACKTEST")
+    print("="*80)
+
+    df = load_sensor_logs(node_ids=args.nodes, months=args.months)
+    node_ids = args.nodes or sorted(df['node_id'].unique())
+    horizons = {h: HORIZON_STEPS[h] for h in args.horizons}
+    print(f"✓ Loaded {len(df):,} records for {', '.join(node_ids)}")
+    if not args.no_resample:
+        df = resample_to_grid(df, max_fill_steps=args.max_fill_steps)
+        print(f"✓ Resampled to 5-minute grid: {describe_grid(df)}")
+
+    report = run_backtest(df, horizons, node_ids, n_folds=args.folds, workers=args.workers,
+                          cache_dir=args.feature_cache or None)
+
+    for node_id, node_report in report['summary'].items():
+        for horizon, entry in node_report.items():
+            temp = entry['temperature']
+            print(f"📊 {node_id} {horizon}: temp RMSE={temp['rmse']:.4f}°C, R²={temp['r2']:.4f}, "
+                  f"q10-q90 coverage={temp['q10_q90_coverage']:.1%}, "
+                  f"hum RMSE={entry['humidity']['rmse']:.4f}%, "
+                  f"soil RMSE={entry['soil_moisture']['rmse']:.2f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
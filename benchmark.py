@@ -0,0 +1,299 @@
+"""
+Hot Path Benchmarks
+Replays sensor_logs.csv through feature building, prediction and the
+/predict endpoint and writes the timings to a JSON report; with
+--baseline it fails when any timing regressed past --threshold
+
+Every metric is the best of --rounds independent rounds (interference
+only ever adds time), and the p95/p99 tails are gated against the looser
+--tail-threshold; changes under --min-delta-ms are ignored, so a noisy
+run does not fail the comparison.
+
+Usage:
+    python benchmark.py --output benchmark_report.json
+    python benchmark.py --baseline benchmark_report.json --threshold 0.2 --rounds 5
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sensor_features import HORIZON_STEPS, MAX_LOOKBACK, build_feature_matrix, create_horizon_dataset
+
+# Metrics where a larger value is an improvement; everything else is a time
+HIGHER_IS_BETTER = ('requests_per_s',)
+# Tail latencies, compared against --tail-threshold
+TAIL_METRICS = ('p95_ms', 'p99_ms')
+# Reported but not gated: a single stall moves the mean, p50 covers the typical case
+UNGATED_METRICS = ('mean_ms',)
+
+
+def load_replay(csv_path):
+    """sensor_logs.csv sorted by node_id and created_at"""
+    df = pd.read_csv(csv_path)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    return df.sort_values(['node_id', 'created_at']).reset_index(drop=True)
+
+
+def percentiles(samples_s):
+    """p50/p95/p99/mean in milliseconds"""
+    samples = np.asarray(samples_s) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+    }
+
+
+def timed_runs(func, repeats):
+    """Wall time of each of `repeats` calls, in seconds"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_features(df, node_ids, repeats=5):
+    """Feature matrix and horizon dataset build times"""
+    node_frames = {
+        node_id: df[df['node_id'] == node_id].reset_index(drop=True) for node_id in node_ids
+    }
+    n_rows = sum(len(node_df) for node_df in node_frames.values())
+
+    def build_all():
+        for node_id, node_df in node_frames.items():
+            build_feature_matrix(node_df, node_id)
+
+    build = min(timed_runs(build_all, repeats))
+    dataset = min(timed_runs(lambda: create_horizon_dataset(df, HORIZON_STEPS['1h'], node_ids), repeats))
+    return {
+        'rows': n_rows,
+        'feature_matrix_ms_per_1k_rows': build * 1000 / (n_rows / 1000),
+        'horizon_dataset_1h_ms': dataset * 1000,
+    }
+
+
+def synthetic_model(df, node_ids, model_dir):
+    """
+    Train a small stand-in for extended_horizon_models.pkl
+
+    Trees have the production depth and count so latency is comparable;
+    only the training data is cut down.
+    """
+    from train_extended_horizon import train_extended_horizon_models
+
+    sample = pd.concat([
+        df[df['node_id'] == node_id].head(2000) for node_id in node_ids
+    ]).reset_index(drop=True)
+    models, quantile_models = train_extended_horizon_models(sample, HORIZON_STEPS, node_ids)
+
+    model_path = os.path.join(model_dir, 'synthetic_models.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump({'models': models, 'quantile_models': quantile_models, 'horizons': HORIZON_STEPS}, f)
+    return model_path
+
+
+def bench_prediction(predictor, df, node_ids, repeats=100):
+    """Single-node and batched prediction latency per horizon"""
+    windows = {
+        node_id: df[df['node_id'] == node_id].tail(MAX_LOOKBACK + 1).reset_index(drop=True)
+        for node_id in node_ids
+    }
+    first_node = node_ids[0]
+    report = {'single': {}, 'batched': {}}
+
+    for horizon in predictor.horizons:
+        # Warm up lazily loaded / compiled models outside the timings
+        predictor.predict_batch(windows, [horizon])
+        report['single'][horizon] = percentiles(timed_runs(
+            lambda: predictor.predict(windows[first_node], horizon, first_node), repeats
+        ))
+        report['batched'][horizon] = percentiles(timed_runs(
+            lambda: predictor.predict_batch(windows, [horizon]), repeats
+        ))
+
+    all_horizons = list(predictor.horizons)
+    report['batched']['all'] = percentiles(timed_runs(
+        lambda: predictor.predict_batch(windows, all_horizons), repeats
+    ))
+    report['nodes'] = len(windows)
+    return report
+
+
+def bench_api(model_path, backend, df, node_ids, requests=500):
+    """/predict throughput through the Flask test client"""
+    os.environ['MODEL_PATH'] = model_path
+    os.environ['INFERENCE_BACKEND'] = backend
+    os.environ['PREDICTION_CACHE_PATH'] = ':memory:'
+    import app as api
+
+    frames = {
+        node_id: df[df['node_id'] == node_id].tail(MAX_LOOKBACK + 1).reset_index(drop=True)
+        for node_id in node_ids
+    }
+    api.store_predictions(api.predict_nodes(frames), datetime.utcnow())
+
+    client = api.app.test_client()
+    for node_id in node_ids * 10:
+        client.get(f'/predict?node_id={node_id}')
+    samples = []
+    start = time.perf_counter()
+    for i in range(requests):
+        node_id = node_ids[i % len(node_ids)]
+        request_start = time.perf_counter()
+        response = client.get(f'/predict?node_id={node_id}')
+        samples.append(time.perf_counter() - request_start)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code} for {node_id}")
+    elapsed = time.perf_counter() - start
+
+    return dict(percentiles(samples), requests=requests, requests_per_s=requests / elapsed)
+
+
+def best_of_rounds(rounds):
+    """Report with every numeric leaf replaced by its best value across rounds"""
+    merged = {}
+    for key, value in rounds[0].items():
+        if isinstance(value, dict):
+            merged[key] = best_of_rounds([r[key] for r in rounds])
+        elif isinstance(value, float):
+            best = max if key.endswith(HIGHER_IS_BETTER) else min
+            merged[key] = float(best(r[key] for r in rounds))
+        else:
+            merged[key] = value
+    return merged
+
+
+def flatten_metrics(report, prefix=''):
+    """Numeric leaves of the report as {'a.b.c': value}"""
+    metrics = {}
+    for key, value in report.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f'{name}.'))
+        elif isinstance(value, float):
+            metrics[name] = value
+    return metrics
+
+
+def find_regressions(current, baseline, threshold, tail_threshold=None, min_delta_ms=0.0):
+    """
+    Metrics that got worse than the baseline by more than `threshold`
+    (`tail_threshold` for p95/p99 latencies, default `threshold`) and by
+    more than `min_delta_ms` in absolute time (per request for throughput)
+
+    Returns:
+        List of (metric, baseline, current, relative change)
+    """
+    base_metrics = flatten_metrics(baseline['results'])
+    regressions = []
+    for name, value in flatten_metrics(current['results']).items():
+        base = base_metrics.get(name)
+        if not base or name.endswith(UNGATED_METRICS):
+            continue
+        change = (value - base) / base
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+            delta_ms = 1000 / value - 1000 / base if value else float('inf')
+        else:
+            delta_ms = value - base
+        if delta_ms <= min_delta_ms:
+            continue
+        limit = tail_threshold if tail_threshold is not None and name.endswith(TAIL_METRICS) else threshold
+        if change > limit:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the feature, inference and API hot paths')
+    parser.add_argument('--csv', default='sensor_logs.csv')
+    parser.add_argument('--model', default='extended_horizon_models.pkl',
+                        help='models to benchmark (a synthetic model is trained if missing)')
+    parser.add_argument('--backend', default='xgboost', choices=['xgboost', 'compiled'])
+    parser.add_argument('--repeats', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='independent rounds per latency benchmark; the report keeps the best')
+    parser.add_argument('--skip-api', action='store_true')
+    parser.add_argument('--output', default='benchmark_report.json')
+    parser.add_argument('--baseline', default=None, help='earlier report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before failing (0.2 = 20%%)')
+    parser.add_argument('--tail-threshold', type=float, default=0.5,
+                        help='allowed relative slowdown of p95/p99 latencies')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help='ignore slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("HOT PATH BENCHMARKS")
+    print("="*80)
+
+    df = load_replay(args.csv)
+    node_ids = sorted(df['node_id'].unique())
+    print(f"✓ Replaying {len(df):,} records for {', '.join(node_ids)}")
+
+    results = {'features': bench_features(df, node_ids)}
+    print(f"📊 Feature matrix: {results['features']['feature_matrix_ms_per_1k_rows']:.2f} ms / 1k rows")
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as model_dir:
+        model_path = args.model
+        if not os.path.exists(model_path):
+            print(f"  {model_path} not found, training a synthetic model...")
+            model_path = synthetic_model(df, node_ids, model_dir)
+
+        from predict_extended_horizon import ExtendedHorizonPredictor
+        predictor = ExtendedHorizonPredictor(model_path, backend=args.backend)
+        if not predictor.ready:
+            sys.exit(1)
+
+        results['prediction'] = best_of_rounds([
+            bench_prediction(predictor, df, node_ids, args.repeats) for _ in range(args.rounds)
+        ])
+        for horizon, stats in results['prediction']['single'].items():
+            print(f"📊 Predict {horizon}: single p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms, "
+                  f"batched p50={results['prediction']['batched'][horizon]['p50_ms']:.2f}ms")
+
+        if not args.skip_api:
+            results['api'] = {'predict': best_of_rounds([
+                bench_api(model_path, args.backend, df, node_ids, args.requests) for _ in range(args.rounds)
+            ])}
+            print(f"📊 /predict: {results['api']['predict']['requests_per_s']:.0f} req/s, "
+                  f"p99={results['api']['predict']['p99_ms']:.2f}ms")
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'backend': args.backend,
+        'rounds': args.rounds,
+        'model': args.model if os.path.exists(args.model) else 'synthetic',
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Saved: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold, args.tail_threshold,
+                                       args.min_delta_ms)
+        for name, base, value, change in regressions:
+            print(f"✗ {name}: {base:.3f} -> {value:.3f} ({change:+.1%} worse)")
+        if regressions:
+            sys.exit(1)
+        print(f"✓ No regressions beyond {args.threshold:.0%} ({args.tail_threshold:.0%} for p95/p99) "
+              f"of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
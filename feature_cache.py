@@ -0,0 +1,194 @@
+"""
+Feature Cache
+Content-addressed cache of each node's base feature matrix and raw target
+arrays, keyed on the node's source rows and FEATURE_SPEC_VERSION and stored
+as .npy files that are memory-mapped on reuse
+
+Any horizon is a row shift of the same base arrays, so one entry serves
+every horizon, script and repeat run until the data or feature code changes.
+For frames resampled by sensor_grid, the row flags are cached as well so
+horizons can skip rows around gaps.
+
+Layout:
+    <cache>/<node_id>-<key>/features.npy, targets.npy, times.npy, flags.npy
+"""
+
+import os
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from sensor_features import FEATURE_SPEC_VERSION, N_FEATURES, TARGET_COLUMNS, fill_feature_matrix
+from sensor_grid import grid_flags, valid_rows
+
+DEFAULT_CACHE_DIR = 'feature_cache'
+# Feature rows computed at a time when writing an entry
+CHUNK_ROWS = 50_000
+
+# Columns build_feature_matrix reads besides created_at
+SOURCE_COLUMNS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+ARRAY_NAMES = ('features', 'targets', 'times', 'flags')
+
+
+def _epoch_ns(values):
+    """Timestamps as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+def data_key(node_df, node_id):
+    """
+    Hash of one node's source rows and the feature spec
+
+    Covers the timestamps, the raw reading columns exactly as loaded
+    (dtype included) and the grid flags, so rows from a store partition and
+    the same rows parsed from the CSV export only share an entry if they
+    are identical.
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{node_id}|spec={FEATURE_SPEC_VERSION}|features={N_FEATURES}|rows={len(node_df)}'.encode())
+    digest.update(np.ascontiguousarray(_epoch_ns(node_df['created_at'])).tobytes())
+    for column in SOURCE_COLUMNS:
+        values = node_df[column].to_numpy()
+        digest.update(f'|{column}:{values.dtype}'.encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    digest.update(grid_flags(node_df).tobytes())
+    return digest.hexdigest()[:32]
+
+
+def _write_entry(entry_dir, node_df, node_id, chunk_rows=CHUNK_ROWS):
+    """
+    Build and save an entry atomically so readers never see partial files
+
+    The feature matrix is written chunk by chunk straight into a
+    memory-mapped .npy, so it is never held in memory as a whole.
+    """
+    tmp_dir = f'{entry_dir}.tmp-{os.getpid()}'
+    os.makedirs(tmp_dir, exist_ok=True)
+    features = np.lib.format.open_memmap(os.path.join(tmp_dir, 'features.npy'), mode='w+',
+                                         dtype=np.float64, shape=(len(node_df), N_FEATURES))
+    fill_feature_matrix(features, node_df, node_id, chunk_rows)
+    features.flush()
+    del features
+    np.save(os.path.join(tmp_dir, 'targets.npy'), node_df[TARGET_COLUMNS].to_numpy(dtype=np.float64))
+    np.save(os.path.join(tmp_dir, 'times.npy'), _epoch_ns(node_df['created_at']))
+    np.save(os.path.join(tmp_dir, 'flags.npy'), grid_flags(node_df))
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process finished the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def node_entry(node_df, node_id, cache_dir=DEFAULT_CACHE_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    Cache entry for one node, built on a miss
+
+    Args:
+        node_df: One node's rows sorted by created_at
+        node_id: Node the rows belong to
+        cache_dir: Cache root directory
+        chunk_rows: Feature rows computed at a time on a miss
+
+    Returns:
+        (entry directory, True if it was already cached)
+    """
+    entry_dir = os.path.join(cache_dir, f'{node_id}-{data_key(node_df, node_id)}')
+    if os.path.isdir(entry_dir):
+        return entry_dir, True
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_entry(entry_dir, node_df, node_id, chunk_rows)
+    return entry_dir, False
+
+
+def entry_paths(entry_dir):
+    """(features, targets, times, flags) .npy paths of an entry"""
+    return tuple(os.path.join(entry_dir, f'{name}.npy') for name in ARRAY_NAMES)
+
+
+def load_entry(entry_dir):
+    """Memory-mapped (features, targets, times, flags) arrays of an entry"""
+    return tuple(np.load(path, mmap_mode='r') for path in entry_paths(entry_dir))
+
+
+def cached_node_arrays(df, node_ids, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Base arrays for each node, from the cache where possible
+
+    Args:
+        df: Sensor DataFrame sorted by node_id and created_at
+        node_ids: Nodes to load
+
+    Returns:
+        Dict of node_id -> (features, targets, times, flags) memory maps,
+        with targets in TARGET_COLUMNS order, times in epoch ns and
+        sensor_grid row flags
+    """
+    arrays, hits = {}, 0
+    for node_id in node_ids:
+        node_df = df[df['node_id'] == node_id].reset_index(drop=True)
+        entry_dir, hit = node_entry(node_df, node_id, cache_dir)
+        arrays[node_id] = load_entry(entry_dir)
+        hits += hit
+    print(f"✓ Feature cache: {hits}/{len(arrays)} node(s) reused from {cache_dir}/")
+    return arrays
+
+
+def streamed_node_arrays(load_node, node_ids, cache_dir=DEFAULT_CACHE_DIR, chunk_rows=CHUNK_ROWS):
+    """
+    cached_node_arrays for histories too large to load at once
+
+    Rows are read one node at a time through load_node(node_id) and
+    dropped once that node's entry exists; only the memory maps are kept.
+
+    Returns:
+        Dict of node_id -> (features, targets, times, flags) memory maps
+    """
+    arrays, hits = {}, 0
+    for node_id in node_ids:
+        node_df = load_node(node_id).reset_index(drop=True)
+        if len(node_df) == 0:
+            continue
+        entry_dir, hit = node_entry(node_df, node_id, cache_dir, chunk_rows)
+        del node_df
+        arrays[node_id] = load_entry(entry_dir)
+        hits += hit
+    print(f"✓ Feature cache: {hits}/{len(arrays)} node(s) reused from {cache_dir}/")
+    return arrays
+
+
+def horizon_arrays(features, targets, flags, steps, observed_targets=False):
+    """
+    Gap-free rows with full lookback and their targets `steps` ahead
+
+    Args:
+        observed_targets: Only keep rows whose target is a real reading
+
+    Returns:
+        (rows, X, y): base row positions, their features and the target rows
+        (y[i] is targets[rows[i] + steps])
+    """
+    rows = valid_rows(flags, steps, observed_targets=observed_targets)
+    return rows, np.asarray(features[rows]), np.asarray(targets[rows + steps])
+
+
+def cached_horizon_dataset(df, horizon_steps, node_list=['node_1', 'node_2'],
+                           cache_dir=DEFAULT_CACHE_DIR, observed_targets=False):
+    """
+    Cached drop-in for sensor_features.create_horizon_dataset
+
+    Returns:
+        (X, y_temp, y_hum, y_soil, indices) where indices are the
+        per-node row positions of each target reading
+    """
+    X_parts, y_parts = [np.empty((0, N_FEATURES))], [np.empty((0, len(TARGET_COLUMNS)))]
+    indices = []
+    for features, targets, _, flags in cached_node_arrays(df, node_list, cache_dir).values():
+        rows, X, y = horizon_arrays(features, targets, flags, horizon_steps, observed_targets)
+        if len(rows) == 0:
+            continue
+        X_parts.append(X)
+        y_parts.append(y)
+        indices.extend((rows + horizon_steps).tolist())
+
+    X, y = np.concatenate(X_parts), np.concatenate(y_parts)
+    return X, y[:, 0], y[:, 1], y[:, 2], indices
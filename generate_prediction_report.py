@@ -0,0 +1,340 @@
+"""
+Figure 4.6, 4.7, 4.8: Prediction vs. Actual Report for Any Horizon
+Loads the sensor data and cached feature matrices once, trains and
+evaluates the XGBoost models for every (node, horizon) in a process pool,
+then renders the figures in a second pool with the Agg backend
+
+Outputs per horizon (the node id is appended when several nodes are requested):
+    Figure_4.6_Temperature_Prediction_vs_Actual_<H>_<Mon>.png
+    Figure_4.7_Humidity_Prediction_vs_Actual_<H>_<Mon>.png
+    Figure_4.8_Soil_Moisture_Prediction_vs_Actual_<H>_<Mon>.png
+    Figures_4.6-4.8_Combined_Summary_<H>_<Mon>.png
+    prediction_results_<H>_<Mon>.csv
+    prediction_metrics_<H>_<Mon>.json
+
+Usage:
+    python generate_prediction_report.py --horizons 1h 4h --nodes node_1 --months 11
+"""
+
+import os
+import json
+import time
+import calendar
+import tempfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import TimeSeriesSplit
+from sensor_features import HORIZON_STEPS
+from sensor_store import load_sensor_logs
+from sensor_grid import describe_grid, resample_to_grid
+from feature_cache import DEFAULT_CACHE_DIR, entry_paths, horizon_arrays, node_entry
+from train_extended_horizon import XGB_PARAMS, fit_model
+from backtest import regression_metrics
+
+# Target -> (short name, unit in metrics json, MAPE offset as in the original scripts)
+TARGETS = {
+    'temperature': ('temp', 'celsius', 0.0),
+    'humidity': ('hum', 'percent', 0.001),
+    'soil_moisture': ('soil', 'arbitrary', 0.001),
+}
+
+# Figure number, file stem, axis label, stats format, unit, y-limits per target
+FIGURES = {
+    'temperature': ('4.6', 'Temperature', 'Temperature (°C)', '.4f', '°C', None),
+    'humidity': ('4.7', 'Humidity', 'Humidity (%)', '.4f', '%', (0, 100)),
+    'soil_moisture': ('4.8', 'Soil_Moisture', 'Soil Moisture (Arbitrary Units)', '.2f', '', None),
+}
+
+RESULT_COLUMNS = ['Timestamp', 'Actual_Temperature_C', 'Predicted_Temperature_C',
+                  'Actual_Humidity_Pct', 'Predicted_Humidity_Pct',
+                  'Actual_Soil_Moisture', 'Predicted_Soil_Moisture']
+
+
+def evaluate_horizon(task):
+    """
+    Train on the first 3/4 of a node's horizon dataset and predict the rest
+
+    Mirrors the original visualization scripts: the scaler is fit on all
+    rows and the test window is the last TimeSeriesSplit(3) fold. Only
+    gap-free rows whose target is a real reading are used.
+
+    Args:
+        task: (node_id, horizon, steps, features_path, targets_path, times_path, flags_path)
+
+    Returns:
+        Dict with test times, actual/predicted values and metrics per target
+    """
+    node_id, horizon, steps, features_path, targets_path, times_path, flags_path = task
+    features = np.load(features_path, mmap_mode='r')
+    targets = np.load(targets_path, mmap_mode='r')
+    times = np.load(times_path, mmap_mode='r')
+
+    rows, X, y = horizon_arrays(features, targets, np.load(flags_path), steps, observed_targets=True)
+    X_scaled = StandardScaler().fit_transform(X)
+    train_idx, test_idx = list(TimeSeriesSplit(n_splits=3).split(X_scaled))[-1]
+
+    result = {
+        'node_id': node_id,
+        'horizon': horizon,
+        'times': np.asarray(times[rows[test_idx] + steps]),
+        'actual': {},
+        'predicted': {},
+        'metrics': {},
+    }
+    for column, (target, (_, _, mape_offset)) in enumerate(TARGETS.items()):
+        model = fit_model(X_scaled[train_idx], y[train_idx, column], dict(XGB_PARAMS, n_jobs=1))
+        predicted = model.predict(X_scaled[test_idx])
+        result['actual'][target] = y[test_idx, column]
+        result['predicted'][target] = predicted
+        result['metrics'][target] = regression_metrics(y[test_idx, column], predicted, mape_offset)
+    return result
+
+
+def _plot_pair(ax, times, actual, predicted, linewidth, markersize, actual_label):
+    ax.plot(times, actual, label=actual_label, linewidth=linewidth, color='#2E86AB',
+            marker='o', markersize=markersize, alpha=0.8)
+    ax.plot(times, predicted, label='XGBoost Predictions', linewidth=linewidth, color='#A23B72',
+            marker='s', markersize=markersize, alpha=0.8, linestyle='--')
+
+
+def render_target_figure(job):
+    """Single-target prediction vs. actual figure"""
+    path, target, frame, metrics, subtitle, hour_interval, dpi = job
+    number, _, ylabel, fmt, unit, ylim = FIGURES[target]
+    short = TARGETS[target][0]
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    _plot_pair(ax, frame['timestamp'], frame[f'actual_{short}'], frame[f'pred_{short}'],
+               2.5, 4, 'Actual Sensor Data')
+    ax.set_xlabel('Time (UTC)', fontsize=12, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+    title = ylabel.split(' (')[0]
+    ax.set_title(f'Figure {number}: {title} Prediction vs. Actual Readings\n({subtitle})',
+                 fontsize=14, fontweight='bold', pad=20)
+    ax.legend(fontsize=11, loc='best', framealpha=0.95)
+    ax.grid(True, alpha=0.3, linestyle='--')
+
+    ax.xaxis.set_major_locator(mdates.HourLocator(interval=hour_interval))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d %H:%M'))
+    plt.xticks(rotation=45, ha='right')
+
+    stats_text = (f"RMSE: {metrics['rmse']:{fmt}}{unit}\nR² Score: {metrics['r2']:.4f}\n"
+                  f"Samples: {len(frame):,}")
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, fontsize=10,
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+    if ylim:
+        ax.set_ylim(list(ylim))
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def render_summary_figure(job):
+    """Three stacked panels for temperature, humidity and soil moisture"""
+    path, frame, metrics, subtitle, hour_interval, dpi = job
+    fig, axes = plt.subplots(3, 1, figsize=(14, 12))
+
+    for ax, (target, (number, _, ylabel, fmt, unit, ylim)) in zip(axes, FIGURES.items()):
+        short = TARGETS[target][0]
+        _plot_pair(ax, frame['timestamp'], frame[f'actual_{short}'], frame[f'pred_{short}'],
+                   2, 3, 'Actual Data')
+        title = ylabel.split(' (')[0]
+        ax.set_ylabel(ylabel.replace('Arbitrary Units', 'Arb. Units'), fontsize=11, fontweight='bold')
+        ax.set_title(f"Figure {number}: {title} Predictions "
+                     f"(RMSE: {metrics[target]['rmse']:{fmt}}{unit}, R²: {metrics[target]['r2']:.4f})",
+                     fontsize=12, fontweight='bold')
+        if ylim:
+            ax.set_ylim(list(ylim))
+        ax.legend(fontsize=10, loc='best')
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.xaxis.set_major_locator(mdates.HourLocator(interval=hour_interval))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+
+    axes[-1].set_xlabel('Time (UTC)', fontsize=11, fontweight='bold')
+    plt.setp(axes[0].get_xticklabels(), visible=False)
+    plt.setp(axes[1].get_xticklabels(), visible=False)
+    plt.xticks(rotation=45, ha='right')
+
+    plt.suptitle(f'Figures 4.6-4.8: XGBoost Model Performance - Prediction vs. Actual Readings\n({subtitle})',
+                 fontsize=15, fontweight='bold', y=0.995)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def render_figure(job):
+    kind, args = job
+    return render_summary_figure(args) if kind == 'summary' else render_target_figure(args)
+
+
+def prediction_frame(result):
+    """Test-window predictions sorted by time, in the plotting layout"""
+    frame = pd.DataFrame({'timestamp': pd.to_datetime(result['times'])})
+    for target, (short, _, _) in TARGETS.items():
+        frame[f'actual_{short}'] = result['actual'][target]
+        frame[f'pred_{short}'] = result['predicted'][target]
+    return frame.sort_values('timestamp').reset_index(drop=True)
+
+
+def write_results(frame, path):
+    """prediction_results CSV with the original column names and error columns"""
+    export_df = frame.copy()
+    export_df.columns = RESULT_COLUMNS
+    export_df['Temp_Error_C'] = export_df['Actual_Temperature_C'] - export_df['Predicted_Temperature_C']
+    export_df['Humidity_Error_Pct'] = export_df['Actual_Humidity_Pct'] - export_df['Predicted_Humidity_Pct']
+    export_df['Soil_Moisture_Error'] = export_df['Actual_Soil_Moisture'] - export_df['Predicted_Soil_Moisture']
+    export_df.to_csv(path, index=False)
+
+
+def write_metrics(result, hours, data_source, n_samples, path):
+    """prediction_metrics JSON in the original layout"""
+    summary = {
+        'forecast_horizon_hours': hours,
+        'data_source': data_source,
+        'test_samples': int(n_samples),
+    }
+    for target, (_, unit, _) in TARGETS.items():
+        metrics = result['metrics'][target]
+        summary[target] = {key: metrics[key] for key in ('rmse', 'mae', 'mape', 'r2')}
+        summary[target]['unit'] = unit
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def data_labels(df, months):
+    """(file name suffix, data source, figure subtitle period) for the loaded months"""
+    if not months:
+        return 'All', 'All data', 'All Data'
+    names = [calendar.month_name[int(m[5:7]) if isinstance(m, str) else int(m)] for m in months]
+    years = sorted(set(pd.DatetimeIndex(df['created_at']).year)) if len(df) else []
+    year = f" {'-'.join(str(y) for y in years)}" if years else ''
+    return ('_'.join(name[:3] for name in names),
+            f"{', '.join(names)}{year}",
+            f"{', '.join(names)} Data")
+
+
+def print_metrics(node_id, horizon, metrics):
+    print(f"\n📊 {node_id} {horizon.upper()} HORIZON")
+    for target, (_, _, _, fmt, unit, _) in FIGURES.items():
+        m = metrics[target]
+        print(f"  {target:<14} RMSE={m['rmse']:{fmt}}{unit}  MAE={m['mae']:{fmt}}{unit}  "
+              f"MAPE={m['mape']:.2f}%  R²={m['r2']:.4f}")
+
+
+def generate_report(horizons, node_ids, months=None, output_dir='.', workers=None,
+                    plot_workers=None, dpi=300, cache_dir=DEFAULT_CACHE_DIR, max_fill_steps=2):
+    """
+    Evaluate and plot every node and horizon
+
+    Args:
+        horizons: Horizon names (keys of HORIZON_STEPS)
+        node_ids: Nodes to report on
+        months: Month numbers or 'YYYY-MM' strings to load (default: all)
+        output_dir: Where figures, CSVs and metrics go
+        workers: Training process pool size (default: CPU count)
+        plot_workers: Rendering process pool size (default: CPU count)
+        dpi: Figure resolution
+        cache_dir: Feature cache directory (None: a temporary one)
+        max_fill_steps: Longest run of missing 5-minute slots to interpolate,
+            or None to use the raw readings without resampling
+
+    Returns:
+        List of written file paths
+    """
+    start = time.perf_counter()
+    df = load_sensor_logs(node_ids=node_ids, months=months)
+    print(f"✓ Loaded {len(df):,} records for {', '.join(node_ids)}")
+    suffix, data_source, period = data_labels(df, months)
+    if max_fill_steps is not None:
+        df = resample_to_grid(df, max_fill_steps=max_fill_steps)
+        print(f"✓ Resampled to 5-minute grid: {describe_grid(df)}")
+
+    with tempfile.TemporaryDirectory(prefix='report_') as tmp_dir:
+        tasks = []
+        for node_id in node_ids:
+            node_df = df[df['node_id'] == node_id].reset_index(drop=True)
+            entry_dir, hit = node_entry(node_df, node_id, cache_dir or tmp_dir)
+            print(f"✓ {node_id}: {len(node_df):,} rows, features {'reused from cache' if hit else 'built'}")
+            for horizon in horizons:
+                tasks.append((node_id, horizon, HORIZON_STEPS[horizon]) + entry_paths(entry_dir))
+
+        print(f"\nTraining {len(tasks) * len(TARGETS)} model(s) for {len(tasks)} node/horizon pair(s)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(evaluate_horizon, tasks))
+
+    os.makedirs(output_dir, exist_ok=True)
+    written, jobs = [], []
+    for result in results:
+        node_id, horizon = result['node_id'], result['horizon']
+        hours = HORIZON_STEPS[horizon] * 5 // 60
+        tag = f"{horizon.upper()}_{suffix}" + (f"_{node_id}" if len(node_ids) > 1 else '')
+        subtitle = f"{hours}-Hour Forecast Horizon - {period}"
+        hour_interval = 6 if hours < 4 else 12
+        frame = prediction_frame(result)
+        print_metrics(node_id, horizon, result['metrics'])
+
+        results_path = os.path.join(output_dir, f'prediction_results_{tag}.csv')
+        metrics_path = os.path.join(output_dir, f'prediction_metrics_{tag}.json')
+        write_results(frame, results_path)
+        write_metrics(result, hours, data_source, len(frame), metrics_path)
+        written += [results_path, metrics_path]
+
+        for target, (number, stem, _, _, _, _) in FIGURES.items():
+            path = os.path.join(output_dir, f'Figure_{number}_{stem}_Prediction_vs_Actual_{tag}.png')
+            jobs.append(('target', (path, target, frame, result['metrics'][target],
+                                    subtitle, hour_interval, dpi)))
+        path = os.path.join(output_dir, f'Figures_4.6-4.8_Combined_Summary_{tag}.png')
+        jobs.append(('summary', (path, frame, result['metrics'], subtitle, hour_interval, dpi)))
+
+    print(f"\nRendering {len(jobs)} figure(s)...")
+    with ProcessPoolExecutor(max_workers=plot_workers) as pool:
+        written += list(pool.map(render_figure, jobs))
+
+    print(f"\n✓ Report complete in {time.perf_counter() - start:.1f}s")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prediction vs. actual report for every horizon')
+    parser.add_argument('--horizons', nargs='+', default=['1h', '4h'], choices=list(HORIZON_STEPS))
+    parser.add_argument('--nodes', nargs='+', default=['node_1'])
+    parser.add_argument('--months', nargs='+', type=int, default=[11])
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--workers', type=int, default=None, help='training processes')
+    parser.add_argument('--plot-workers', type=int, default=None, help='rendering processes')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--feature-cache', default=DEFAULT_CACHE_DIR,
+                        help="feature cache directory ('' for a temporary one)")
+    parser.add_argument('--max-fill-steps', type=int, default=2,
+                        help='longest run of missing 5-minute slots to interpolate')
+    parser.add_argument('--no-resample', action='store_true',
+                        help='use the raw readings instead of the 5-minute grid')
+    args = parser.parse_args(argv)
+
+    print("="*80)
+    print(f"GENERATING {', '.join(h.upper() for h in args.horizons)} FORECAST REPORT")
+    print("="*80)
+
+    written = generate_report(args.horizons, args.nodes, months=args.months,
+                              output_dir=args.output_dir, workers=args.workers,
+                              plot_workers=args.plot_workers, dpi=args.dpi,
+                              cache_dir=args.feature_cache or None,
+                              max_fill_steps=None if args.no_resample else args.max_fill_steps)
+
+    print("\nGenerated Files:")
+    for path in sorted(written):
+        print(f"  • {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Sensor Reading Ingest
+Parses and validates readings pushed to POST /ingest and writes them to
+sensor_logs in micro-batches, one bulk insert per batch
+"""
+
+import io
+import csv
+import hmac
+import json
+import math
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+from sensor_sync import SENSOR_COLUMNS, _sensor_frame
+
+logger = logging.getLogger(__name__)
+
+# sensor_logs columns clients may send (id is assigned by the table)
+READING_COLUMNS = [column for column in SENSOR_COLUMNS if column != 'id']
+NUMERIC_COLUMNS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+
+MAX_READINGS_PER_REQUEST = 5000
+
+# created_at outside [EARLIEST_READING, receipt time + MAX_CLOCK_SKEW] is rejected
+EARLIEST_READING = pd.Timestamp('2000-01-01', tz='UTC')
+MAX_CLOCK_SKEW = timedelta(hours=1)
+
+
+class InvalidReading(ValueError):
+    """A reading that does not fit the sensor_logs schema"""
+
+
+def authorized(header, token):
+    """
+    Whether a request's Authorization header carries the shared ingest token
+
+    Accepts "Bearer <token>" or the bare token. Without a configured token
+    nothing is authorized, so the endpoint is closed until one is set.
+    """
+    if not token or not header:
+        return False
+    supplied = header[len('Bearer '):] if header.startswith('Bearer ') else header
+    return hmac.compare_digest(supplied.strip().encode(), token.encode())
+
+
+def parse_payload(body, content_type):
+    """
+    Raw readings from a request body
+
+    Accepts a JSON object, a JSON list of objects, {"readings": [...]},
+    or CSV with a header row naming sensor_logs columns.
+
+    Returns:
+        List of reading dicts (not yet validated)
+    """
+    if content_type in ('text/csv', 'application/csv'):
+        text = body.decode('utf-8') if isinstance(body, bytes) else body
+        readings = list(csv.DictReader(io.StringIO(text.strip())))
+    else:
+        payload = json.loads(body) if body else None
+        if isinstance(payload, dict) and 'readings' in payload:
+            payload = payload['readings']
+        readings = [payload] if isinstance(payload, dict) else payload
+
+    if not isinstance(readings, list) or not readings:
+        raise InvalidReading('Expected a reading, a list of readings or {"readings": [...]}')
+    if len(readings) > MAX_READINGS_PER_REQUEST:
+        raise InvalidReading(f'At most {MAX_READINGS_PER_REQUEST} readings per request')
+    return readings
+
+
+def _number(value, column):
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise InvalidReading(f'{column} must be a number')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidReading(f'{column} must be a number') from None
+    if not math.isfinite(number):
+        raise InvalidReading(f'{column} must be finite')
+    return number
+
+
+def validate_reading(raw, now=None):
+    """
+    Normalize one reading to the sensor_logs schema
+
+    node_id is required; measurements are nullable doubles; created_at is
+    an ISO 8601 string (naive times are UTC) between EARLIEST_READING and
+    an hour past receipt, defaults to the time of receipt and is stored
+    as UTC.
+
+    Returns:
+        Dict with READING_COLUMNS keys
+    """
+    if not isinstance(raw, dict):
+        raise InvalidReading('Reading must be an object')
+
+    if None in raw:
+        # csv.DictReader files values beyond the header under the key None
+        raise InvalidReading('More values than header columns')
+    unknown = set(raw) - set(SENSOR_COLUMNS)
+    if unknown:
+        raise InvalidReading(f"Unknown field(s): {', '.join(sorted(map(str, unknown)))}")
+
+    node_id = raw.get('node_id')
+    if not isinstance(node_id, str) or not node_id.strip():
+        raise InvalidReading('node_id is required')
+
+    reading = {'node_id': node_id.strip()}
+    for column in NUMERIC_COLUMNS:
+        reading[column] = _number(raw.get(column), column)
+
+    now = now or datetime.now(timezone.utc)
+    created_at = raw.get('created_at')
+    if created_at in (None, ''):
+        reading['created_at'] = now
+    else:
+        if not isinstance(created_at, str):
+            # pd.Timestamp would read a number as epoch nanoseconds
+            raise InvalidReading('created_at must be an ISO 8601 timestamp')
+        try:
+            reading['created_at'] = pd.Timestamp(created_at)
+        except (TypeError, ValueError):
+            raise InvalidReading('created_at must be an ISO 8601 timestamp') from None
+        if reading['created_at'] is pd.NaT:
+            raise InvalidReading('created_at must be an ISO 8601 timestamp')
+        if reading['created_at'].tzinfo is None:
+            reading['created_at'] = reading['created_at'].tz_localize('UTC')
+        else:
+            reading['created_at'] = reading['created_at'].tz_convert('UTC')
+        if not EARLIEST_READING <= reading['created_at'] <= pd.Timestamp(now) + MAX_CLOCK_SKEW:
+            raise InvalidReading('created_at is outside the accepted range')
+
+    return reading
+
+
+def validate_readings(raw_readings):
+    """
+    Validate every reading of a request
+
+    Returns:
+        (readings DataFrame, list of {'index', 'error'} for rejected readings)
+    """
+    now = datetime.now(timezone.utc)
+    valid, rejected = [], []
+    for index, raw in enumerate(raw_readings):
+        try:
+            valid.append(validate_reading(raw, now))
+        except InvalidReading as e:
+            rejected.append({'index': index, 'error': str(e)})
+
+    rows = [dict(reading, id=None) for reading in valid]
+    return _sensor_frame(rows), rejected
+
+
+def _record(reading):
+    """JSON-ready insert row"""
+    record = {}
+    for column in READING_COLUMNS:
+        value = reading[column]
+        if column == 'created_at':
+            value = pd.Timestamp(value).isoformat()
+        elif value is not None and isinstance(value, float) and math.isnan(value):
+            value = None
+        record[column] = value
+    return record
+
+
+class MicroBatchWriter:
+    """
+    Buffers readings and writes them with one bulk insert per batch
+
+    The buffer is flushed as soon as it holds `batch_size` readings and
+    at least every `flush_interval` seconds otherwise. Failed batches stay
+    buffered and are retried on the next flush; beyond `max_pending`
+    readings the oldest are dropped so a database outage cannot exhaust
+    memory. The flusher thread starts with the first submit(), in the
+    process that receives the readings.
+    """
+
+    def __init__(self, client, table='sensor_logs', batch_size=200, flush_interval=2.0,
+                 max_pending=50000):
+        self.client = client
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._pending = []
+        # Rows overflow trimmed from the head of _pending since the current batch was taken
+        self._head_dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def submit(self, readings):
+        """Queue readings (a DataFrame or list of dicts) for insertion"""
+        records = readings.to_dict('records') if isinstance(readings, pd.DataFrame) else readings
+        with self._lock:
+            self._pending.extend(_record(reading) for reading in records)
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+                self._head_dropped += overflow
+                logger.warning(f"Ingest buffer full, dropped {overflow} oldest reading(s)")
+            full = len(self._pending) >= self.batch_size
+            if self._thread is None and not self._stopped.is_set():
+                self._thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Write everything buffered now
+
+        Returns:
+            Number of readings written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.batch_size]
+                    self._head_dropped = 0
+                if not batch:
+                    break
+                try:
+                    self.client.table(self.table).insert(batch).execute()
+                except Exception as e:
+                    logger.error(f"Error writing {len(batch)} sensor reading(s): {e}")
+                    break
+                with self._lock:
+                    # Overflow may have trimmed part of the batch from the head
+                    # meanwhile; those rows were written after all, and only
+                    # what is left of the batch comes off the buffer
+                    trimmed = min(self._head_dropped, len(batch))
+                    self.dropped -= trimmed
+                    del self._pending[:len(batch) - trimmed]
+                written += len(batch)
+
+        if written:
+            self.written += written
+            logger.info(f"✓ Inserted {written} sensor reading(s)")
+        return written
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
+
+    def close(self):
+        """Stop the background flusher after a final flush"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
@@ -0,0 +1,212 @@
+"""
+Compact Model Store
+Saves the extended horizon models as native XGBoost UBJSON boosters and
+raw scaler arrays with a JSON manifest, and loads each horizon lazily
+
+Layout:
+    <store>/manifest.json
+    <store>/<horizon>/<model>.ubj
+    <store>/<horizon>/scaler_mean.npy, scaler_scale.npy
+
+Usage:
+    python model_store.py extended_horizon_models.pkl extended_horizon_models
+"""
+
+import os
+import sys
+import json
+import pickle
+import threading
+from collections.abc import Mapping
+import numpy as np
+import xgboost as xgb
+
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+class ArrayScaler:
+    """StandardScaler replacement backed by (memory-mapped) mean/scale arrays"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    @classmethod
+    def from_scaler(cls, scaler):
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if getattr(scaler, 'mean_', None) is not None else np.zeros(n)
+        scale = scaler.scale_ if getattr(scaler, 'scale_', None) is not None else np.ones(n)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def _save_group(group, group_dir, rel_dir):
+    """Write one horizon's models/scaler and return its manifest entry"""
+    entry = {}
+    for name, value in group.items():
+        if hasattr(value, 'save_model'):
+            filename = f'{name}.ubj'
+            value.save_model(os.path.join(group_dir, filename))
+            model_type = 'booster' if isinstance(value, xgb.Booster) else 'xgboost'
+            entry[name] = {'type': model_type, 'path': f'{rel_dir}/{filename}'}
+        elif hasattr(value, 'transform') and hasattr(value, 'n_features_in_'):
+            scaler = ArrayScaler.from_scaler(value)
+            np.save(os.path.join(group_dir, f'{name}_mean.npy'), scaler.mean_)
+            np.save(os.path.join(group_dir, f'{name}_scale.npy'), scaler.scale_)
+            entry[name] = {
+                'type': 'scaler',
+                'mean': f'{rel_dir}/{name}_mean.npy',
+                'scale': f'{rel_dir}/{name}_scale.npy',
+            }
+        else:
+            # Plain metadata (target lists, quantile levels, ...)
+            entry[name] = {'type': 'value', 'value': value}
+    return entry
+
+
+def save_model_store(models, quantile_models, horizons, store_dir):
+    """
+    Write models in the compact store format
+
+    Args:
+        models: Dict of horizon -> {'scaler': ..., 'temp': ..., ...}
+        quantile_models: Dict of horizon -> {'q10': ..., 'q90': ...}
+        horizons: Dict of horizon -> forecast steps
+        store_dir: Output directory
+
+    Returns:
+        Path to the written manifest
+    """
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'horizons': dict(horizons),
+        'models': {},
+        'quantile_models': {},
+    }
+
+    for horizon in horizons:
+        horizon_dir = os.path.join(store_dir, horizon)
+        os.makedirs(horizon_dir, exist_ok=True)
+        manifest['models'][horizon] = _save_group(models[horizon], horizon_dir, horizon)
+        manifest['quantile_models'][horizon] = _save_group(
+            quantile_models[horizon], horizon_dir, horizon
+        )
+
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def export_model_store(pkl_path, store_dir):
+    """Convert a pickled extended_horizon_models.pkl into the compact store"""
+    with open(pkl_path, 'rb') as f:
+        data = pickle.load(f)
+    return save_model_store(data['models'], data['quantile_models'], data['horizons'], store_dir)
+
+
+def is_model_store(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def _load_model(path, native=False):
+    """
+    Parse a model from its UBJSON file
+
+    XGBoost copies the bytes into its own heap buffers, so loaded boosters
+    are private to the process that parsed them; only preloading before a
+    fork shares them (copy-on-write).
+    """
+    with open(path, 'rb') as f:
+        raw = bytearray(f.read())
+    if native:
+        return xgb.Booster(model_file=raw)
+    model = xgb.XGBRegressor()
+    model.load_model(raw)
+    return model
+
+
+class _LazyHorizonMap(Mapping):
+    """Read-only horizon -> model dict mapping that loads each horizon on first access"""
+
+    def __init__(self, entries, loader):
+        self._entries = entries
+        self._loader = loader
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, horizon):
+        group = self._loaded.get(horizon)
+        if group is None:
+            entry = self._entries[horizon]
+            with self._lock:
+                group = self._loaded.get(horizon)
+                if group is None:
+                    group = self._loaded[horizon] = self._loader(entry)
+        return group
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ModelStore:
+    """
+    Lazily loaded view of a compact model store
+
+    `models` and `quantile_models` behave like the dicts stored in the
+    pickle, but a horizon's boosters are only parsed the first time it is
+    used. Scaler arrays are memory-mapped, so forked workers share their
+    pages. Boosters are parsed onto the heap; call preload() before forking
+    (app.py does under gunicorn --preload) so workers share them
+    copy-on-write instead of each parsing its own.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model store version: {self.manifest.get('format_version')}")
+
+        self.horizons = self.manifest['horizons']
+        self.models = _LazyHorizonMap(self.manifest['models'], self._load_group)
+        self.quantile_models = _LazyHorizonMap(self.manifest['quantile_models'], self._load_group)
+
+    def _path(self, rel_path):
+        return os.path.join(self.store_dir, rel_path)
+
+    def _load_group(self, entry):
+        group = {}
+        for name, item in entry.items():
+            if item['type'] in ('xgboost', 'booster'):
+                group[name] = _load_model(self._path(item['path']), native=item['type'] == 'booster')
+            elif item['type'] == 'scaler':
+                group[name] = ArrayScaler(
+                    np.load(self._path(item['mean']), mmap_mode='r'),
+                    np.load(self._path(item['scale']), mmap_mode='r'),
+                )
+            else:
+                group[name] = item['value']
+        return group
+
+    def preload(self):
+        """Load every horizon now instead of on first use"""
+        for horizon in self.horizons:
+            self.models[horizon]
+            self.quantile_models[horizon]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python model_store.py <models.pkl> <store_dir>")
+        sys.exit(1)
+
+    manifest_path = export_model_store(sys.argv[1], sys.argv[2])
+    print(f"✓ Model store written: {manifest_path}")
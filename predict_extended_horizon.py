@@ -7,18 +7,47 @@ with uncertainty quantification for robust forecasting
 import pickle
 import numpy as np
 import pandas as pd
+import xgboost as xgb
 from datetime import timedelta
+from metrics import timed
+from model_store import ModelStore, is_model_store
+from sensor_features import MAX_LOOKBACK, build_feature_matrix
+from sensor_window import SensorWindow
+from tree_inference import compile_horizon
 
 class ExtendedHorizonPredictor:
     """Advanced multi-horizon weather predictor with uncertainty bands"""
     
-    def __init__(self, model_path='extended_horizon_models.pkl'):
+    def __init__(self, model_path='extended_horizon_models.pkl', backend='xgboost'):
+        """
+        Args:
+            model_path: Pickled models file, or a model store directory
+                written by model_store.py
+            backend: 'xgboost' to call the models directly, or 'compiled'
+                to evaluate each horizon as flattened NumPy tree arrays
+                (see tree_inference.py)
+        """
+        if backend not in ('xgboost', 'compiled'):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.backend = backend
+        # Compiled ensemble per horizon, built on first use
+        self.compiled = {}
+        # Lazily loaded ModelStore when model_path is a store directory
+        self.store = None
         try:
-            with open(model_path, 'rb') as f:
-                data = pickle.load(f)
-            self.models = data['models']
-            self.quantile_models = data['quantile_models']
-            self.horizons = data['horizons']
+            if is_model_store(model_path):
+                # Compact store: horizons are loaded on first use
+                data = ModelStore(model_path)
+                self.store = data
+                self.models = data.models
+                self.quantile_models = data.quantile_models
+                self.horizons = data.horizons
+            else:
+                with open(model_path, 'rb') as f:
+                    data = pickle.load(f)
+                self.models = data['models']
+                self.quantile_models = data['quantile_models']
+                self.horizons = data['horizons']
             self.ready = True
             print("✓ Extended horizon models loaded successfully")
         except Exception as e:
@@ -30,91 +59,33 @@ class ExtendedHorizonPredictor:
         Create comprehensive feature vector from sensor data
         
         Args:
-            df: DataFrame with sensor data
+            df: DataFrame or SensorWindow with sensor data
             index: Current row index
             node_id: Node identifier ('node_1' or 'node_2')
         
         Returns:
-            Feature vector (30 features)
+            Feature vector (29 features)
         """
-        # Windows
-        window_30 = df.iloc[max(0, index-6):index]           # Last 30 min
-        window_1h = df.iloc[max(0, index-12):index]          # Last 1 hour
-        window_2h = df.iloc[max(0, index-24):index]          # Last 2 hours
-        window_4h = df.iloc[max(0, index-48):index]          # Last 4 hours
-        
-        # Temperature features
-        temp_30_mean = window_30['temperature'].mean()
-        temp_30_std = window_30['temperature'].std() or 0
-        temp_30_range = window_30['temperature'].max() - window_30['temperature'].min()
-        
-        temp_1h_mean = window_1h['temperature'].mean()
-        temp_1h_std = window_1h['temperature'].std() or 0
-        temp_1h_trend = window_1h['temperature'].iloc[-1] - window_1h['temperature'].iloc[0]
-        
-        temp_2h_mean = window_2h['temperature'].mean()
-        temp_2h_std = window_2h['temperature'].std() or 0
-        
-        temp_4h_mean = window_4h['temperature'].mean()
-        temp_4h_std = window_4h['temperature'].std() or 0
-        
-        # Humidity features
-        hum_30_mean = window_30['humidity'].mean()
-        hum_30_std = window_30['humidity'].std() or 0
-        hum_30_range = window_30['humidity'].max() - window_30['humidity'].min()
-        
-        hum_1h_mean = window_1h['humidity'].mean()
-        hum_1h_std = window_1h['humidity'].std() or 0
-        hum_1h_trend = window_1h['humidity'].iloc[-1] - window_1h['humidity'].iloc[0]
-        
-        hum_2h_mean = window_2h['humidity'].mean()
-        hum_2h_std = window_2h['humidity'].std() or 0
-        
-        hum_4h_mean = window_4h['humidity'].mean()
-        hum_4h_std = window_4h['humidity'].std() or 0
-        
-        # Pressure features
-        pressure_mean = window_4h['pressure'].mean()
-        pressure_std = window_4h['pressure'].std() or 0
-        pressure_trend = window_1h['pressure'].iloc[-1] - window_1h['pressure'].iloc[0]
-        
-        # Soil moisture features
-        soil_mean = window_4h['soil_moisture'].mean()
-        soil_std = window_4h['soil_moisture'].std() or 0
-        
-        # Time-of-day feature (sin/cos encoding)
-        hour_of_day = pd.to_datetime(df['created_at'].iloc[index]).hour
-        hour_sin = np.sin(2 * np.pi * hour_of_day / 24)
-        hour_cos = np.cos(2 * np.pi * hour_of_day / 24)
-        
-        # Node identifier
-        node_code = 1 if node_id == 'node_2' else 0
-        
-        # Assemble feature vector
-        features = np.array([[
-            temp_30_mean, temp_30_std, temp_30_range,
-            temp_1h_mean, temp_1h_std, temp_1h_trend,
-            temp_2h_mean, temp_2h_std,
-            temp_4h_mean, temp_4h_std,
-            hum_30_mean, hum_30_std, hum_30_range,
-            hum_1h_mean, hum_1h_std, hum_1h_trend,
-            hum_2h_mean, hum_2h_std,
-            hum_4h_mean, hum_4h_std,
-            pressure_mean, pressure_std, pressure_trend,
-            soil_mean, soil_std,
-            df['altitude'].iloc[index],
-            hour_sin, hour_cos,
-            node_code,
-        ]])
+        # Only the 4-hour lookback plus the current row is needed
+        start = max(0, index - MAX_LOOKBACK)
+        window = df[start:index + 1] if isinstance(df, SensorWindow) else df.iloc[start:index + 1]
+        features = build_feature_matrix(window, node_id)[-1:]
         
         return features
     
+    @staticmethod
+    def _latest_time(df):
+        """Time of the newest reading in a DataFrame or SensorWindow"""
+        if isinstance(df, SensorWindow):
+            return df.latest_time
+        return pd.to_datetime(df['created_at'].iloc[-1])
+    
     def predict(self, df, horizon='4h', node_id='node_1'):
         """
         Generate forecast for specified horizon
         
         Args:
-            df: DataFrame with recent sensor data (last 4+ hours)
+            df: DataFrame or SensorWindow with recent sensor data (last 4+ hours)
             horizon: '1h', '4h', '6h', or '12h'
             node_id: Node identifier
         
@@ -132,26 +103,108 @@ class ExtendedHorizonPredictor:
         last_idx = len(df) - 1
         
         # Create features
-        features = self._make_features(df, last_idx, node_id)
+        with timed('features'):
+            features = self._make_features(df, last_idx, node_id)
+        current_time = self._latest_time(df)
         
-        # Get models
-        horizon_models = self.models[horizon]
-        scaler = horizon_models['scaler']
+        return self._forecast_batch(features, [current_time], [horizon])[0][0]
+    
+    def _forecast_batch(self, features, current_times, horizons_list):
+        """
+        Evaluate every horizon's models on a stacked feature matrix
+        
+        Args:
+            features: (N, 29) feature matrix, one row per node
+            current_times: Timestamp of the latest reading for each row
+            horizons_list: List of valid horizon strings
         
-        # Scale features
-        features_scaled = scaler.transform(features)
+        Returns:
+            List with one list of forecast dictionaries per row
+        """
+        results = [[] for _ in range(len(features))]
+        
+        for horizon in horizons_list:
+            with timed('model', horizon):
+                preds = self._evaluate_horizon(horizon, features)
+            
+            for row, values in enumerate(preds):
+                results[row].append(self._format_forecast(horizon, current_times[row], *values))
+        
+        return results
+    
+    def _evaluate_horizon(self, horizon, features):
+        """(N, 5) temp/hum/soil/q10/q90 predictions for one horizon"""
+        compiled = self._compiled(horizon)
+        if compiled is not None:
+            # Scaler is folded into the thresholds, so raw features go in
+            return compiled.predict(features)
         
-        # Make predictions
-        temp_pred = horizon_models['temp'].predict(features_scaled)[0]
-        hum_pred = horizon_models['hum'].predict(features_scaled)[0]
-        soil_pred = horizon_models['soil'].predict(features_scaled)[0]
+        # Get models
+        horizon_models = self.models[horizon]
+        quantile_models = self.quantile_models[horizon]
         
-        # Get uncertainty intervals for temperature
-        q10_pred = self.quantile_models[horizon]['q10'].predict(features_scaled)[0]
-        q90_pred = self.quantile_models[horizon]['q90'].predict(features_scaled)[0]
+        # Scale all rows once for this horizon
+        features_scaled = horizon_models['scaler'].transform(features)
         
+        # One call per model over the whole matrix
+        return np.column_stack([
+            self._point_predictions(horizon_models, features_scaled),
+            self._band_predictions(quantile_models, features_scaled),
+        ])
+    
+    def _compiled(self, horizon):
+        """Compiled ensemble for a horizon, or None to use XGBoost directly"""
+        if self.backend != 'compiled':
+            return None
+        if horizon not in self.compiled:
+            try:
+                self.compiled[horizon] = compile_horizon(
+                    self.models[horizon], self.quantile_models[horizon]
+                )
+            except NotImplementedError as e:
+                print(f"Compiled inference unavailable for {horizon}, using XGBoost: {e}")
+                self.compiled[horizon] = None
+        return self.compiled[horizon]
+    
+    def preload(self):
+        """Load (and compile) every horizon now, e.g. before forking workers"""
+        if self.store is not None:
+            self.store.preload()
+        for horizon in self.horizons:
+            self._compiled(horizon)
+    
+    @staticmethod
+    def _evaluate(model, features):
+        """Predict with an XGBRegressor or a native Booster"""
+        if isinstance(model, xgb.Booster):
+            return model.inplace_predict(features)
+        return model.predict(features)
+    
+    def _point_predictions(self, horizon_models, features_scaled):
+        """(N, 3) temp/hum/soil predictions from separate or multi-output models"""
+        if 'multi' in horizon_models:
+            preds = np.asarray(self._evaluate(horizon_models['multi'], features_scaled))
+            preds = preds.reshape(len(features_scaled), -1)
+            order = horizon_models['targets']
+            return preds[:, [order.index(name) for name in ('temp', 'hum', 'soil')]]
+        return np.column_stack([
+            self._evaluate(horizon_models[name], features_scaled) for name in ('temp', 'hum', 'soil')
+        ])
+    
+    def _band_predictions(self, quantile_models, features_scaled):
+        """(N, 2) q10/q90 temperature bounds from separate or multi-quantile models"""
+        if 'quantiles' in quantile_models:
+            preds = np.asarray(self._evaluate(quantile_models['quantiles'], features_scaled))
+            preds = preds.reshape(len(features_scaled), -1)
+            alphas = quantile_models['alphas']
+            return preds[:, [alphas.index(0.1), alphas.index(0.9)]]
+        return np.column_stack([
+            self._evaluate(quantile_models[name], features_scaled) for name in ('q10', 'q90')
+        ])
+    
+    def _format_forecast(self, horizon, current_time, temp_pred, hum_pred, soil_pred, q10_pred, q90_pred):
+        """Assemble the forecast dictionary for one node and horizon"""
         # Calculate forecast time
-        current_time = pd.to_datetime(df['created_at'].iloc[-1])
         forecast_steps = self.horizons[horizon]
         forecast_time = current_time + timedelta(minutes=forecast_steps * 5)
         
@@ -178,31 +231,67 @@ class ExtendedHorizonPredictor:
             'confidence': 'High' if horizon in ['1h', '4h'] else 'Moderate' if horizon == '6h' else 'Low',
         }
     
+    def _valid_horizons(self, horizons_list):
+        """Drop unknown horizons, reporting each one like predict() does"""
+        valid = []
+        for horizon in horizons_list:
+            if horizon in self.horizons:
+                valid.append(horizon)
+            else:
+                print(f"Invalid horizon. Options: {list(self.horizons.keys())}")
+        return valid
+    
     def predict_sequence(self, df, horizons_list=['1h', '4h', '6h'], node_id='node_1'):
         """
         Generate forecasts for multiple horizons
         
         Args:
-            df: DataFrame with recent sensor data
+            df: DataFrame or SensorWindow with recent sensor data
             horizons_list: List of horizon strings
             node_id: Node identifier
         
         Returns:
             List of forecast dictionaries
         """
-        results = []
-        for horizon in horizons_list:
-            pred = self.predict(df, horizon, node_id)
-            if pred:
-                results.append(pred)
-        return results
+        return self.predict_batch({node_id: df}, horizons_list).get(node_id, [])
+    
+    def predict_batch(self, node_frames, horizons_list=['1h', '4h', '6h']):
+        """
+        Generate forecasts for several nodes and horizons in one pass
+        
+        Features are built once per node and stacked, then each horizon's
+        scaler and models run once over the whole matrix.
+        
+        Args:
+            node_frames: Dict of node_id -> DataFrame or SensorWindow with recent sensor data
+            horizons_list: List of horizon strings
+        
+        Returns:
+            Dict of node_id -> list of forecast dictionaries (same format as predict)
+        """
+        if not self.ready:
+            return {}
+        
+        horizons_list = self._valid_horizons(horizons_list)
+        node_ids = [node_id for node_id, df in node_frames.items() if len(df) > 0]
+        if not node_ids or not horizons_list:
+            return {node_id: [] for node_id in node_frames}
+        
+        with timed('features'):
+            features = np.vstack([
+                self._make_features(node_frames[node_id], len(node_frames[node_id]) - 1, node_id)
+                for node_id in node_ids
+            ])
+        current_times = [self._latest_time(node_frames[node_id]) for node_id in node_ids]
+        
+        forecasts = self._forecast_batch(features, current_times, horizons_list)
+        return dict(zip(node_ids, forecasts))
 
 # Example usage
 if __name__ == "__main__":
     # Load sample data
-    df = pd.read_csv('sensor_logs.csv')
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df = df.sort_values(['node_id', 'created_at']).reset_index(drop=True)
+    from sensor_store import load_sensor_logs
+    df = load_sensor_logs(node_ids=['node_1'])
     
     # Initialize predictor
     predictor = ExtendedHorizonPredictor()
@@ -0,0 +1,212 @@
+"""
+Prediction Cache
+Shares pre-serialized prediction responses between all API workers,
+keyed by node and horizon, with TTL expiry and per-node versioning
+"""
+
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+# Key under which a node's full /predict response is stored
+ALL_HORIZONS = '*'
+
+CacheEntry = namedtuple('CacheEntry', ['body', 'version', 'prediction_time', 'expires_at'])
+
+
+class InMemoryPredictionCache:
+    """
+    Process-local cache with the same interface as PredictionCache
+
+    Suitable for a single worker or as a stand-in during development.
+    """
+
+    def __init__(self, ttl=7200, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = {}          # node_id -> {key: CacheEntry}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def put(self, node_id, bodies, prediction_time):
+        """
+        Replace a node's cached responses
+
+        Args:
+            node_id: Node identifier
+            bodies: Dict of key (horizon or ALL_HORIZONS) -> serialized JSON body
+            prediction_time: ISO timestamp of the prediction run
+
+        Returns:
+            New version number for the node
+        """
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            version = self._versions.get(node_id, 0) + 1
+            self._versions[node_id] = version
+            # Swapping the node's own dict replaces all its keys at once
+            self._entries[node_id] = {
+                key: CacheEntry(body, version, prediction_time, expires_at)
+                for key, body in bodies.items()
+            }
+        return version
+
+    def get(self, node_id, key=ALL_HORIZONS):
+        """Cached entry for a node/key, or None if missing or expired"""
+        entry = self._entries.get(node_id, {}).get(key)
+        if entry is None or entry.expires_at < self.clock():
+            return None
+        return entry
+
+    def nodes(self):
+        """Dict of node_id -> prediction_time for nodes with live entries"""
+        now = self.clock()
+        with self._lock:
+            entries = [(node_id, keys.get(ALL_HORIZONS)) for node_id, keys in self._entries.items()]
+        return {
+            node_id: entry.prediction_time
+            for node_id, entry in entries
+            if entry is not None and entry.expires_at >= now
+        }
+
+
+class PredictionCache:
+    """
+    SQLite-backed cache shared by every worker process on the host
+
+    Reads are served from a per-process memo and only go back to SQLite
+    once an entry is older than `refresh_interval` seconds, so dashboard
+    polling stays in memory while new runs from any worker show up quickly.
+    put() refreshes the memo, so the writing process serves its own run
+    immediately.
+    """
+
+    def __init__(self, path='prediction_cache.sqlite3', ttl=7200, refresh_interval=1.0,
+                 clock=time.time):
+        """
+        Args:
+            path: SQLite database file shared by the workers
+            ttl: Seconds an entry stays valid
+            refresh_interval: Seconds a memoized read is served without SQLite
+            clock: Wall-clock time source (expiry times are shared between processes)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._local = threading.local()
+        self._memo = {}             # (node_id, key) -> (CacheEntry or None, fetched at)
+        self._memo_lock = threading.Lock()
+
+        # Schema setup on a short-lived connection: a connection left open
+        # here would be inherited by forked workers
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS prediction_cache (
+                node_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                prediction_time TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (node_id, key)
+            );
+            CREATE TABLE IF NOT EXISTS prediction_versions (
+                node_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+        """)
+        conn.close()
+
+    def _conn(self):
+        """One connection per thread (sqlite3 connections aren't thread-safe)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def put(self, node_id, bodies, prediction_time):
+        """
+        Replace a node's cached responses
+
+        Args:
+            node_id: Node identifier
+            bodies: Dict of key (horizon or ALL_HORIZONS) -> serialized JSON body
+            prediction_time: ISO timestamp of the prediction run
+
+        Returns:
+            New version number for the node
+        """
+        expires_at = self.clock() + self.ttl
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("""
+                INSERT INTO prediction_versions (node_id, version) VALUES (?, 1)
+                ON CONFLICT(node_id) DO UPDATE SET version = version + 1
+            """, (node_id,))
+            version = conn.execute(
+                'SELECT version FROM prediction_versions WHERE node_id = ?', (node_id,)
+            ).fetchone()[0]
+            conn.executemany("""
+                INSERT OR REPLACE INTO prediction_cache
+                    (node_id, key, version, prediction_time, expires_at, body)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (node_id, key, version, prediction_time, expires_at, body)
+                for key, body in bodies.items()
+            ])
+            # Drop keys (e.g. horizons) that this run no longer produced
+            conn.execute(
+                'DELETE FROM prediction_cache WHERE node_id = ? AND version < ?', (node_id, version)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        now = self.clock()
+        with self._memo_lock:
+            for memo_key in [k for k in self._memo if k[0] == node_id and k[1] not in bodies]:
+                self._memo[memo_key] = (None, now)
+            for key, body in bodies.items():
+                self._memo[(node_id, key)] = (CacheEntry(body, version, prediction_time, expires_at), now)
+        return version
+
+    def get(self, node_id, key=ALL_HORIZONS):
+        """Cached entry for a node/key, or None if missing or expired"""
+        now = self.clock()
+        memo = self._memo.get((node_id, key))
+        if memo is not None and now - memo[1] < self.refresh_interval:
+            entry = memo[0]
+        else:
+            row = self._conn().execute("""
+                SELECT body, version, prediction_time, expires_at FROM prediction_cache
+                WHERE node_id = ? AND key = ?
+            """, (node_id, key)).fetchone()
+            entry = CacheEntry(*row) if row else None
+            with self._memo_lock:
+                self._memo[(node_id, key)] = (entry, now)
+
+        if entry is None or entry.expires_at < now:
+            return None
+        return entry
+
+    def nodes(self):
+        """Dict of node_id -> prediction_time for nodes with live entries"""
+        rows = self._conn().execute("""
+            SELECT node_id, prediction_time FROM prediction_cache
+            WHERE key = ? AND expires_at >= ?
+        """, (ALL_HORIZONS, self.clock())).fetchall()
+        return dict(rows)
+
+
+def create_prediction_cache(path, ttl=7200):
+    """SQLite cache at `path`, or the in-memory stand-in for ':memory:'"""
+    if path == ':memory:':
+        return InMemoryPredictionCache(ttl=ttl)
+    return PredictionCache(path, ttl=ttl)
@@ -0,0 +1,129 @@
+"""
+Event-Driven Prediction Trigger
+Refreshes a node's forecasts when new readings arrive, debounced and
+coalesced per node, with at most one prediction run in flight
+"""
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionTrigger:
+    """
+    Debounced, coalescing per-node trigger
+
+    notify() marks nodes as changed. A node fires once no new reading has
+    arrived for `debounce` seconds, or `max_wait` seconds after its first
+    unprocessed reading if readings keep coming, and never more often than
+    every `min_interval` seconds. All due nodes are handed to `run` in one
+    call on a single worker thread, so a burst of readings costs one
+    prediction pass; while a pass runs, new notifications just update the
+    pending set, which holds at most one entry per node. The worker thread
+    starts with the first notify().
+    """
+
+    def __init__(self, run, debounce=20.0, max_wait=120.0, min_interval=60.0,
+                 max_pending=1000, clock=time.monotonic):
+        """
+        Args:
+            run: Callable taking a list of node_ids
+            debounce: Quiet period before a node fires (seconds)
+            max_wait: Longest a changed node waits while readings keep arriving
+            min_interval: Shortest time between two runs for the same node
+            max_pending: Nodes tracked at once; notifications beyond it are dropped
+            clock: Monotonic time source
+        """
+        self.run = run
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self.clock = clock
+        self.runs = 0
+        self.dropped = 0
+        self._pending = {}      # node_id -> (first notify, last notify)
+        self._last_run = {}     # node_id -> time of the last run that included it
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def pending(self):
+        with self._condition:
+            return list(self._pending)
+
+    def notify(self, node_ids):
+        """
+        Record new data for nodes
+
+        Returns:
+            Number of nodes accepted (new or already pending)
+        """
+        now = self.clock()
+        accepted = 0
+        with self._condition:
+            for node_id in node_ids:
+                entry = self._pending.get(node_id)
+                if entry is None:
+                    if len(self._pending) >= self.max_pending:
+                        self.dropped += 1
+                        continue
+                    entry = (now, now)
+                self._pending[node_id] = (entry[0], now)
+                accepted += 1
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._loop, name='prediction-trigger', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        if accepted < len(node_ids):
+            logger.warning(f"Prediction trigger full, dropped {len(node_ids) - accepted} node(s)")
+        return accepted
+
+    def _due_time(self, node_id, first, last):
+        due = min(last + self.debounce, first + self.max_wait)
+        last_run = self._last_run.get(node_id)
+        if last_run is not None:
+            due = max(due, last_run + self.min_interval)
+        return due
+
+    def _take_due(self, now):
+        """Remove due nodes and record them as run at `now`; returns them and when the next one falls due"""
+        due, next_due = [], None
+        for node_id, (first, last) in list(self._pending.items()):
+            when = self._due_time(node_id, first, last)
+            if when <= now:
+                due.append(node_id)
+                del self._pending[node_id]
+                self._last_run[node_id] = now
+            elif next_due is None or when < next_due:
+                next_due = when
+        return due, next_due
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    now = self.clock()
+                    due, next_due = self._take_due(now)
+                    if due:
+                        break
+                    self._condition.wait(None if next_due is None else next_due - now)
+
+            try:
+                self.run(sorted(due))
+                self.runs += 1
+            except Exception as e:
+                logger.error(f"Error in triggered prediction for {', '.join(due)}: {e}")
+
+    def close(self):
+        """Stop the worker; pending nodes are discarded"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,202 @@
+"""
+Prediction History Writer
+Flattens forecasts into one typed row per node, horizon and target and
+upserts them in bulk into prediction_history, spooling batches to local
+JSONL files while the database is unreachable
+"""
+
+import os
+import re
+import json
+import asyncio
+import logging
+import pandas as pd
+from async_supabase import AsyncWriteQueue
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_TABLE = 'prediction_history'
+# Primary key of prediction_history; re-sent rows overwrite instead of duplicating
+CONFLICT_COLUMNS = 'node_id,horizon,target,forecast_time'
+TARGETS = ('temperature', 'humidity', 'soil_moisture')
+
+
+def _utc_iso(value):
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.tz_convert('UTC').isoformat()
+
+
+def flatten_predictions(results, prediction_time):
+    """
+    One row per node, horizon and target
+
+    Args:
+        results: Dict of node_id -> list of forecast dictionaries
+        prediction_time: When the forecasts were made (naive times are UTC)
+
+    Returns:
+        List of prediction_history rows; q10/q90 are only set for temperature
+    """
+    prediction_time = _utc_iso(prediction_time)
+    rows = []
+    for node_id, predictions in results.items():
+        for pred in predictions:
+            forecast_time = _utc_iso(pred['forecast_time'])
+            for target in TARGETS:
+                values = pred[target]
+                rows.append({
+                    'node_id': node_id,
+                    'horizon': pred['horizon'],
+                    'target': target,
+                    'forecast_time': forecast_time,
+                    'prediction_time': prediction_time,
+                    'minutes_ahead': int(pred['minutes_ahead']),
+                    'value': float(values['value']),
+                    'q10': float(values['lower_bound']) if 'lower_bound' in values else None,
+                    'q90': float(values['upper_bound']) if 'upper_bound' in values else None,
+                })
+    return rows
+
+
+def _process_alive(pid):
+    """Whether a process with this pid is running (and so may still own its spool)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SpoolingWriteQueue(AsyncWriteQueue):
+    """
+    Background upserts that survive database outages
+
+    A batch that cannot be written is appended to a JSONL spool of this
+    process (`spool_path` plus the pid, so worker processes never append
+    to the same file). After the next successful write the spool is
+    replayed, together with spools left behind by processes that have
+    exited. Upserts make replays idempotent, so a row written twice is
+    harmless. Lines that cannot be parsed, such as one cut short by a
+    crash, are moved to `spool_path + '.bad'` instead of failing every
+    replay. Spool file I/O runs off the event loop.
+    """
+
+    def __init__(self, rest, table, spool_path, on_conflict=None, **kwargs):
+        self.spool_path = spool_path
+        self.spooled = 0
+        self.quarantined = 0
+        self._claims = 0
+        super().__init__(rest, table, on_conflict=on_conflict, **kwargs)
+
+    def _own_spool(self):
+        # Looked up on every use: the queue may have been created before a fork
+        return f'{self.spool_path}.{os.getpid()}'
+
+    def _spool(self, batch):
+        path = self._own_spool()
+        with open(path, 'a') as f:
+            for row in batch:
+                f.write(json.dumps(row) + '\n')
+        self.spooled += len(batch)
+        logger.warning(f"Spooled {len(batch)} {self.table} row(s) to {path}")
+
+    def _claim_spools(self):
+        """
+        Move this process's spool and orphaned ones aside for replay
+
+        Claiming is an atomic rename to a name owned by this process, so
+        when several workers look at the same orphan only one replays it.
+
+        Returns:
+            Paths of the claimed files
+        """
+        directory, name = os.path.split(os.path.abspath(self.spool_path))
+        # spool_path (written before spools were per process), spool_path.<pid>
+        # and spool_path.<pid>.replay-<n> (claimed, not yet replayed)
+        pattern = re.compile(re.escape(name) + r'(?:\.(\d+))?(\.replay(?:-\d+)?)?')
+        own = self._own_spool()
+        claimed = []
+        for entry in sorted(os.listdir(directory)):
+            match = pattern.fullmatch(entry)
+            if match is None:
+                continue
+            path = os.path.join(directory, entry)
+            pid = int(match.group(1)) if match.group(1) else None
+            if pid == os.getpid() and match.group(2):
+                # Claimed earlier by this process; a failed replay left it behind
+                claimed.append(path)
+                continue
+            if pid is not None and pid != os.getpid() and _process_alive(pid):
+                continue
+            target = path
+            while os.path.exists(target):
+                self._claims += 1
+                target = f'{own}.replay-{self._claims}'
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue    # Another process claimed it first
+            claimed.append(target)
+        return claimed
+
+    def _read_spool(self, path):
+        """Rows of a claimed spool; lines that don't parse go to the .bad file"""
+        rows, bad = [], []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    bad.append(line if line.endswith('\n') else line + '\n')
+        if bad:
+            with open(self.spool_path + '.bad', 'a') as f:
+                f.writelines(bad)
+            self.quarantined += len(bad)
+            logger.error(f"Moved {len(bad)} unreadable spool line(s) from {path} to {self.spool_path}.bad")
+        return rows
+
+    async def _replay(self):
+        """Write spooled rows; whatever fails goes back into this process's spool"""
+        written = 0
+        try:
+            for path in await asyncio.to_thread(self._claim_spools):
+                rows = await asyncio.to_thread(self._read_spool, path)
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start:start + self.batch_size]
+                    try:
+                        await super().write(batch)
+                    except Exception as e:
+                        # Claimed files not reached yet stay claimed for the next replay
+                        logger.error(f"Spool replay failed: {e}")
+                        await asyncio.to_thread(self._spool, rows[start:])
+                        await asyncio.to_thread(os.remove, path)
+                        return
+                    written += len(batch)
+                await asyncio.to_thread(os.remove, path)
+        finally:
+            if written:
+                logger.info(f"✓ Replayed {written} spooled {self.table} row(s)")
+
+    async def write(self, batch):
+        try:
+            await super().write(batch)
+        except Exception:
+            await asyncio.to_thread(self._spool, batch)
+            raise
+        # The batch itself is written; a replay problem must not count it as failed
+        try:
+            await self._replay()
+        except Exception as e:
+            logger.error(f"Spool replay failed: {e}")
+
+
+def create_prediction_writer(rest, spool_path='prediction_spool.jsonl', batch_size=500):
+    """Write queue for prediction_history upserts"""
+    return SpoolingWriteQueue(rest, PREDICTION_TABLE, spool_path,
+                              on_conflict=CONFLICT_COLUMNS, batch_size=batch_size)
@@ -0,0 +1,308 @@
+"""
+Sensor Rollups
+Incrementally maintained 5-minute, hourly and daily min/mean/max buckets
+per node, plus LTTB downsampling so dashboard charts get a bounded number
+of points for any range
+
+Rollups live in the memory of each process and only cover the readings
+that process syncs or is sent. With ROLLUP_SEED=true, app.py backfills the
+last ROLLUP_SEED_DAYS of the local history (sensor_store/ or
+sensor_logs.csv) first. Readings that only reached another worker through
+/ingest are not in this worker's rollups until they are synced back from
+sensor_logs.
+"""
+
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METRICS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+
+NS_PER_SECOND = 1_000_000_000
+RESOLUTIONS = {
+    '5m': 300 * NS_PER_SECOND,
+    '1h': 3600 * NS_PER_SECOND,
+    '1d': 86400 * NS_PER_SECOND,
+}
+
+# How long each resolution (and the raw readings) is kept, in days; None keeps everything
+DEFAULT_RETENTION_DAYS = {'raw': 7, '5m': 31, '1h': 366, '1d': None}
+
+
+def _epoch_ns(values):
+    """Timestamps as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+def _iso(ns):
+    return pd.Timestamp(int(ns), tz='UTC').isoformat()
+
+
+def lttb(times, values, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last point and, from each of the n_out - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, which preserves
+    peaks and troughs far better than striding or averaging.
+
+    Returns:
+        Indices of the kept points
+    """
+    n = len(times)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = times.astype(np.float64)
+    y = values
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+class _Buckets:
+    """count/sum/min/max per metric for the buckets of one node and resolution"""
+
+    def __init__(self, width_ns):
+        self.width_ns = width_ns
+        self.stats = {}     # bucket start -> (4, n_metrics) array
+
+    def add(self, times, values):
+        starts = times - times % self.width_ns
+        keys, inverse = np.unique(starts, return_inverse=True)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+
+        count = np.zeros((len(keys), values.shape[1]))
+        total = np.zeros_like(count)
+        low = np.full_like(count, np.inf)
+        high = np.full_like(count, -np.inf)
+        np.add.at(count, inverse, present)
+        np.add.at(total, inverse, filled)
+        np.minimum.at(low, inverse, np.where(present, values, np.inf))
+        np.maximum.at(high, inverse, np.where(present, values, -np.inf))
+
+        for i, key in enumerate(keys.tolist()):
+            existing = self.stats.get(key)
+            if existing is None:
+                self.stats[key] = np.stack([count[i], total[i], low[i], high[i]])
+            else:
+                existing[0] += count[i]
+                existing[1] += total[i]
+                np.minimum(existing[2], low[i], out=existing[2])
+                np.maximum(existing[3], high[i], out=existing[3])
+
+    def trim(self, before_ns):
+        # Buckets are created in time order (RollupStore only adds newer
+        # readings), so the oldest ones are at the front of the dict
+        while self.stats:
+            key = next(iter(self.stats))
+            if key >= before_ns:
+                break
+            del self.stats[key]
+
+    def query(self, start_ns, end_ns):
+        """(bucket starts, (n, 4, n_metrics) stats) for buckets starting in [start, end)"""
+        keys = sorted(key for key in self.stats if start_ns <= key < end_ns)
+        if not keys:
+            return np.empty(0, dtype=np.int64), np.empty((0, 4, len(METRICS)))
+        return np.asarray(keys, dtype=np.int64), np.stack([self.stats[key] for key in keys])
+
+
+class RollupStore:
+    """
+    Per-node rollups fed reading by reading
+
+    add() folds new readings into every resolution at once and keeps a
+    bounded buffer of raw readings. Readings at or before the newest one
+    already folded in for a node are skipped, so re-delivered rows are not
+    counted twice; late readings are skipped too, counted in `dropped`.
+    """
+
+    def __init__(self, retention_days=None):
+        self.retention_days = dict(DEFAULT_RETENTION_DAYS, **(retention_days or {}))
+        self.dropped = 0
+        self._buckets = {}      # node_id -> {resolution: _Buckets}
+        self._raw = {}          # node_id -> [times, values] chunks
+        self._newest = {}       # node_id -> newest reading ns
+        self._lock = threading.Lock()
+
+    @property
+    def nodes(self):
+        return sorted(self._newest)
+
+    def add(self, node_id, rows):
+        """
+        Fold a node's new readings into its rollups
+
+        Args:
+            rows: DataFrame with created_at and METRICS columns
+
+        Returns:
+            Number of readings added
+        """
+        if rows.empty:
+            return 0
+        times = _epoch_ns(rows['created_at'])
+        values = rows.reindex(columns=METRICS).to_numpy(dtype=np.float64)
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+
+        with self._lock:
+            newest = self._newest.get(node_id)
+            if newest is not None:
+                fresh = times > newest
+                stale = len(times) - int(fresh.sum())
+                if stale:
+                    self.dropped += stale
+                    logger.warning(f"Skipped {stale} reading(s) for {node_id} at or before "
+                                   f"its newest rollup reading {_iso(newest)}")
+                times, values = times[fresh], values[fresh]
+            if len(times) == 0:
+                return 0
+
+            buckets = self._buckets.setdefault(
+                node_id, {name: _Buckets(width) for name, width in RESOLUTIONS.items()}
+            )
+            for group in buckets.values():
+                group.add(times, values)
+            raw = self._raw.setdefault(node_id, [])
+            raw.append((times, values))
+            self._newest[node_id] = int(times[-1])
+            self._trim(node_id)
+        return len(times)
+
+    def backfill(self, history, days=None):
+        """
+        Fold in historical rows of every node, e.g. at startup
+
+        Args:
+            history: DataFrame with node_id, created_at and METRICS columns
+            days: Only the last `days` before each node's newest row (None: all)
+
+        Returns:
+            Number of readings added
+        """
+        added = 0
+        for node_id, rows in history.groupby('node_id', sort=True, observed=True):
+            if days is not None:
+                times = _epoch_ns(rows['created_at'])
+                rows = rows[times >= times.max() - int(days * 86400 * NS_PER_SECOND)]
+            added += self.add(node_id, rows)
+        return added
+
+    def _trim(self, node_id):
+        newest = self._newest[node_id]
+        for resolution, group in self._buckets[node_id].items():
+            days = self.retention_days.get(resolution)
+            if days is not None:
+                group.trim(newest - int(days * 86400 * NS_PER_SECOND))
+
+        # Merge raw chunks so the buffer stays a handful of arrays
+        chunks = self._raw[node_id]
+        if len(chunks) > 64:
+            chunks[:] = [(np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks]))]
+        days = self.retention_days.get('raw')
+        if days is not None and chunks[0][0][0] < newest - int(days * 86400 * NS_PER_SECOND):
+            cutoff = newest - int(days * 86400 * NS_PER_SECOND)
+            times = np.concatenate([c[0] for c in chunks])
+            values = np.concatenate([c[1] for c in chunks])
+            keep = times >= cutoff
+            chunks[:] = [(times[keep], values[keep])]
+
+    def _range(self, node_id, start, end, default_hours=24):
+        newest = self._newest[node_id]
+        end_ns = int(_epoch_ns([end])[0]) if end is not None else newest + 1
+        start_ns = (int(_epoch_ns([start])[0]) if start is not None
+                    else end_ns - int(default_hours * 3600 * NS_PER_SECOND))
+        return start_ns, end_ns
+
+    def rollups(self, node_id, resolution='1h', start=None, end=None):
+        """
+        Aggregated buckets for a node
+
+        Returns:
+            List of {'time', 'count', <metric>: {'min', 'mean', 'max'}} dicts,
+            or None if the node has no readings
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution}. Options: {list(RESOLUTIONS)}")
+        with self._lock:
+            if node_id not in self._newest:
+                return None
+            start_ns, end_ns = self._range(node_id, start, end, default_hours=24 * 7)
+            keys, stats = self._buckets[node_id][resolution].query(start_ns, end_ns)
+
+        buckets = []
+        for key, (count, total, low, high) in zip(keys, stats):
+            bucket = {'time': _iso(key), 'count': int(count.max())}
+            for column, metric in enumerate(METRICS):
+                if count[column] > 0:
+                    bucket[metric] = {
+                        'min': float(low[column]),
+                        'mean': float(total[column] / count[column]),
+                        'max': float(high[column]),
+                    }
+                else:
+                    bucket[metric] = None
+            buckets.append(bucket)
+        return buckets
+
+    def series(self, node_id, metric='temperature', start=None, end=None, points=500):
+        """
+        At most `points` values of one metric over a range, LTTB-downsampled
+
+        Raw readings are used while the range is within the raw retention;
+        older ranges fall back to the finest rollup still covering them
+        (bucket means).
+
+        Returns:
+            (source, list of [time, value]), or None if the node has no readings
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric}. Options: {METRICS}")
+        column = METRICS.index(metric)
+
+        with self._lock:
+            if node_id not in self._newest:
+                return None
+            start_ns, end_ns = self._range(node_id, start, end)
+            chunks = self._raw[node_id]
+            raw_times = np.concatenate([c[0] for c in chunks])
+            if raw_times[0] <= start_ns:
+                raw_values = np.concatenate([c[1] for c in chunks])[:, column]
+                in_range = (raw_times >= start_ns) & (raw_times < end_ns)
+                source, times, values = 'raw', raw_times[in_range], raw_values[in_range]
+            else:
+                for source in RESOLUTIONS:
+                    days = self.retention_days.get(source)
+                    covered_from = self._newest[node_id] - int(days * 86400 * NS_PER_SECOND) if days else None
+                    if covered_from is None or covered_from <= start_ns:
+                        break
+                times, stats = self._buckets[node_id][source].query(start_ns, end_ns)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    values = stats[:, 1, column] / stats[:, 0, column]
+
+        present = ~np.isnan(values)
+        times, values = times[present], values[present]
+        kept = lttb(times, values, points)
+        return source, [[_iso(times[i]), float(values[i])] for i in kept]
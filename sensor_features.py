@@ -0,0 +1,371 @@
+"""
+Shared Feature Engine
+Vectorized computation of the 29-feature vector used by the
+extended horizon models, for every row of a node in one pass
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rolling windows in 5-minute steps
+WINDOW_30 = 6       # Last 30 min
+WINDOW_1H = 12      # Last 1 hour
+WINDOW_2H = 24      # Last 2 hours
+WINDOW_4H = 48      # Last 4 hours
+MAX_LOOKBACK = WINDOW_4H
+
+# Forecast horizons in 5-minute steps
+HORIZON_STEPS = {'1h': 12, '4h': 48, '6h': 72, '12h': 144}
+
+TARGET_COLUMNS = ['temperature', 'humidity', 'soil_moisture']
+
+FEATURE_NAMES = [
+    'temp_30_mean', 'temp_30_std', 'temp_30_range',
+    'temp_1h_mean', 'temp_1h_std', 'temp_1h_trend',
+    'temp_2h_mean', 'temp_2h_std',
+    'temp_4h_mean', 'temp_4h_std',
+    'hum_30_mean', 'hum_30_std', 'hum_30_range',
+    'hum_1h_mean', 'hum_1h_std', 'hum_1h_trend',
+    'hum_2h_mean', 'hum_2h_std',
+    'hum_4h_mean', 'hum_4h_std',
+    'pressure_mean', 'pressure_std', 'pressure_trend',
+    'soil_mean', 'soil_std',
+    'altitude',
+    'hour_sin', 'hour_cos',
+    'node_code',
+]
+N_FEATURES = len(FEATURE_NAMES)
+
+# Bump whenever build_feature_matrix output or the cached arrays change; it keys the feature cache
+FEATURE_SPEC_VERSION = 2
+
+
+def node_code(node_id):
+    """Numeric node identifier used as the last feature"""
+    return 1 if node_id == 'node_2' else 0
+
+
+def _windows(values, size):
+    """
+    Trailing windows for every row: row i holds values[i-size:i],
+    left-padded with NaN where fewer than `size` rows precede it
+    """
+    padded = np.concatenate([np.full(size, np.nan), values])
+    return sliding_window_view(padded, size)[:len(values)]
+
+
+def _window_stats(values, size):
+    """
+    Mean, sample std and range of the trailing window of every row (NaN-skipping like pandas)
+
+    Spelled out instead of np.nanmean/nanstd/nanmax, which warn on all-NaN
+    windows; silencing those warnings with warnings.catch_warnings is not
+    thread-safe and the predictor builds features on a worker pool.
+    """
+    win = _windows(values, size)
+    present = ~np.isnan(win)
+    count = present.sum(axis=1)
+    mean = np.where(present, win, 0.0).sum(axis=1) / count
+    deviations = np.where(present, win - mean[:, None], 0.0)
+    std = np.sqrt((deviations * deviations).sum(axis=1) / (count - 1))
+    std[count < 2] = np.nan
+    value_range = np.fmax.reduce(win, axis=1) - np.fmin.reduce(win, axis=1)
+    return mean, std, value_range
+
+
+def _window_trend(values, size):
+    """Last minus first value of the trailing window of every row"""
+    n = len(values)
+    idx = np.arange(n)
+    first = np.full(n, np.nan)
+    last = np.full(n, np.nan)
+    has_rows = idx > 0
+    first[has_rows] = values[np.maximum(0, idx[has_rows] - size)]
+    last[has_rows] = values[idx[has_rows] - 1]
+    return last - first
+
+
+def build_feature_matrix(node_df, node_id='node_1'):
+    """
+    Compute the feature vector for every row of a single node
+
+    Row i matches `ExtendedHorizonPredictor._make_features(node_df, i, node_id)`:
+    windows cover the rows strictly before i (truncated at the start of the
+    frame), altitude and time of day come from row i itself.
+
+    Args:
+        node_df: DataFrame (or SensorWindow) with one node's sensor data,
+            sorted by created_at
+        node_id: Node identifier ('node_1' or 'node_2')
+
+    Returns:
+        Feature matrix of shape (len(node_df), 29); row 0 has no history
+        and is all NaN apart from altitude, time and node features
+    """
+    n = len(node_df)
+    temp = np.asarray(node_df['temperature'], dtype=np.float64)
+    hum = np.asarray(node_df['humidity'], dtype=np.float64)
+    pressure = np.asarray(node_df['pressure'], dtype=np.float64)
+    soil = np.asarray(node_df['soil_moisture'], dtype=np.float64)
+
+    features = np.empty((n, N_FEATURES), dtype=np.float64)
+
+    # Empty and single-row windows produce NaN, same as pandas
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Temperature features
+        features[:, 0], features[:, 1], features[:, 2] = _window_stats(temp, WINDOW_30)
+        features[:, 3], features[:, 4], _ = _window_stats(temp, WINDOW_1H)
+        features[:, 5] = _window_trend(temp, WINDOW_1H)
+        features[:, 6], features[:, 7], _ = _window_stats(temp, WINDOW_2H)
+        features[:, 8], features[:, 9], _ = _window_stats(temp, WINDOW_4H)
+
+        # Humidity features
+        features[:, 10], features[:, 11], features[:, 12] = _window_stats(hum, WINDOW_30)
+        features[:, 13], features[:, 14], _ = _window_stats(hum, WINDOW_1H)
+        features[:, 15] = _window_trend(hum, WINDOW_1H)
+        features[:, 16], features[:, 17], _ = _window_stats(hum, WINDOW_2H)
+        features[:, 18], features[:, 19], _ = _window_stats(hum, WINDOW_4H)
+
+        # Pressure features
+        features[:, 20], features[:, 21], _ = _window_stats(pressure, WINDOW_4H)
+        features[:, 22] = _window_trend(pressure, WINDOW_1H)
+
+        # Soil moisture features
+        features[:, 23], features[:, 24], _ = _window_stats(soil, WINDOW_4H)
+
+    features[:, 25] = np.asarray(node_df['altitude'], dtype=np.float64)
+
+    # Time-of-day feature (sin/cos encoding)
+    hour_of_day = pd.DatetimeIndex(pd.to_datetime(node_df['created_at'])).hour.to_numpy()
+    features[:, 26] = np.sin(2 * np.pi * hour_of_day / 24)
+    features[:, 27] = np.cos(2 * np.pi * hour_of_day / 24)
+
+    features[:, 28] = node_code(node_id)
+
+    return features
+
+
+def fill_feature_matrix(out, node_df, node_id='node_1', chunk_rows=50_000):
+    """
+    build_feature_matrix written chunk by chunk into a preallocated array
+
+    Each chunk is computed from its own rows plus the MAX_LOOKBACK rows
+    before it, which is as far back as any window reaches, so the result
+    equals build_feature_matrix(node_df, node_id) while only one chunk's
+    windows are in memory at a time.
+
+    Args:
+        out: (len(node_df), 29) array to fill, e.g. a memory-mapped .npy
+            from np.lib.format.open_memmap
+        node_df: DataFrame with one node's sensor data, sorted by created_at
+        node_id: Node identifier
+        chunk_rows: Rows computed per chunk
+
+    Returns:
+        out
+    """
+    for start in range(0, len(node_df), chunk_rows):
+        stop = min(start + chunk_rows, len(node_df))
+        begin = max(0, start - MAX_LOOKBACK)
+        out[start:stop] = build_feature_matrix(node_df.iloc[begin:stop], node_id)[start - begin:]
+    return out
+
+
+def create_horizon_dataset(df, horizon_steps, node_list=['node_1', 'node_2']):
+    """
+    Create training dataset for a specific horizon
+
+    Args:
+        df: DataFrame with sensor data sorted by node_id and created_at
+        horizon_steps: Forecast distance in 5-minute steps
+        node_list: Nodes to include
+
+    Returns:
+        (X, y_temp, y_hum, y_soil, indices) where indices are the
+        per-node row positions of each target reading
+    """
+    X_parts = [np.empty((0, N_FEATURES))]
+    y_temp = [np.empty(0)]
+    y_hum = [np.empty(0)]
+    y_soil = [np.empty(0)]
+    indices = []
+
+    for node in node_list:
+        node_df = df[df['node_id'] == node].reset_index(drop=True)
+        rows = np.arange(MAX_LOOKBACK, len(node_df) - horizon_steps)
+        if len(rows) == 0:
+            continue
+
+        X_parts.append(build_feature_matrix(node_df, node)[rows])
+        targets = rows + horizon_steps
+        y_temp.append(node_df['temperature'].to_numpy(dtype=np.float64)[targets])
+        y_hum.append(node_df['humidity'].to_numpy(dtype=np.float64)[targets])
+        y_soil.append(node_df['soil_moisture'].to_numpy(dtype=np.float64)[targets])
+        indices.extend(targets.tolist())
+
+    return (np.concatenate(X_parts), np.concatenate(y_temp),
+            np.concatenate(y_hum), np.concatenate(y_soil), indices)
+
+
+# Columns kept in the streaming ring buffer and the windows tracked for each
+STREAM_COLUMNS = ['temperature', 'humidity', 'pressure', 'soil_moisture']
+STREAM_WINDOWS = (WINDOW_30, WINDOW_1H, WINDOW_2H, WINDOW_4H)
+
+
+class NodeFeatureState:
+    """
+    Streaming feature accumulator for one node
+
+    Keeps a ring buffer of the last 48 readings plus running sums and sums
+    of squares for every window, so each new reading is absorbed in O(1)
+    and the 29-feature vector is available without rebuilding windows.
+    The newest reading plays the role of the "current row": it supplies
+    altitude and time of day, while the windows cover the readings before it.
+    """
+
+    def __init__(self, node_id='node_1', capacity=MAX_LOOKBACK):
+        self.node_id = node_id
+        self.capacity = capacity
+        self._buffer = np.full((capacity, len(STREAM_COLUMNS)), np.nan)
+        self._pos = 0               # Next slot to overwrite
+        self._size = 0              # Readings held in the buffer
+        self._ref = None            # Per-column shift that keeps sums well conditioned
+        self._pushes = 0
+        shape = (len(STREAM_WINDOWS), len(STREAM_COLUMNS))
+        self._sum = np.zeros(shape)
+        self._sumsq = np.zeros(shape)
+        self._count = np.zeros(shape)
+        self.current = None         # Latest reading, not yet part of any window
+        self.current_time = None
+
+    @classmethod
+    def from_frame(cls, df, node_id='node_1', capacity=MAX_LOOKBACK):
+        """Build a state by replaying the tail of a node's DataFrame"""
+        state = cls(node_id, capacity)
+        for reading in df.tail(capacity + 1).to_dict('records'):
+            state.update(reading)
+        return state
+
+    def __len__(self):
+        return self._size + (self.current is not None)
+
+    def update(self, reading):
+        """
+        Absorb a new sensor reading
+
+        Args:
+            reading: Mapping with temperature, humidity, pressure, altitude,
+                soil_moisture and created_at
+        """
+        if self.current is not None:
+            self._push(self.current[:len(STREAM_COLUMNS)])
+
+        self.current = np.array([
+            _as_float(reading.get(column)) for column in STREAM_COLUMNS + ['altitude']
+        ])
+        self.current_time = pd.Timestamp(reading['created_at'])
+
+    def _push(self, values):
+        """Move a reading into the history windows"""
+        if self._ref is None:
+            self._ref = np.nan_to_num(values)
+
+        for w, size in enumerate(STREAM_WINDOWS):
+            if self._size >= size:
+                self._remove(w, self._buffer[(self._pos - size) % self.capacity])
+            self._add(w, values)
+
+        self._buffer[self._pos] = values
+        self._pos = (self._pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+        # Re-derive the sums from the buffer now and then so round-off can't accumulate
+        self._pushes += 1
+        if self._pushes % self.capacity == 0:
+            self._resync()
+
+    def _add(self, w, values):
+        valid = ~np.isnan(values)
+        shifted = np.where(valid, values - self._ref, 0.0)
+        self._sum[w] += shifted
+        self._sumsq[w] += shifted * shifted
+        self._count[w] += valid
+
+    def _remove(self, w, values):
+        valid = ~np.isnan(values)
+        shifted = np.where(valid, values - self._ref, 0.0)
+        self._sum[w] -= shifted
+        self._sumsq[w] -= shifted * shifted
+        self._count[w] -= valid
+
+    def _recent(self, size):
+        """Last `size` buffered readings, oldest first"""
+        size = min(size, self._size)
+        idx = (self._pos - size + np.arange(size)) % self.capacity
+        return self._buffer[idx]
+
+    def _resync(self):
+        for w, size in enumerate(STREAM_WINDOWS):
+            recent = self._recent(size)
+            valid = ~np.isnan(recent)
+            shifted = np.where(valid, recent - self._ref, 0.0)
+            self._sum[w] = shifted.sum(axis=0)
+            self._sumsq[w] = (shifted * shifted).sum(axis=0)
+            self._count[w] = valid.sum(axis=0)
+
+    def _stats(self):
+        """Mean and sample std for every (window, column) pair"""
+        count = self._count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_shifted = self._sum / count
+            var = (self._sumsq - self._sum * mean_shifted) / (count - 1)
+            # Running sums leave a few ulps behind on constant windows
+            var[var <= 1e-12 * (self._sumsq / count)] = 0.0
+        var[count < 2] = np.nan
+        ref = self._ref if self._ref is not None else np.zeros(len(STREAM_COLUMNS))
+        return ref + mean_shifted, np.sqrt(var)
+
+    def features(self):
+        """
+        Current 29-feature vector
+
+        Returns:
+            Feature array of shape (1, 29), or None before the first reading
+        """
+        if self.current is None:
+            return None
+
+        mean, std = self._stats()
+        recent_30 = self._recent(WINDOW_30)
+        recent_1h = self._recent(WINDOW_1H)
+        range_30 = np.fmax.reduce(recent_30, axis=0) - np.fmin.reduce(recent_30, axis=0) \
+            if len(recent_30) else np.full(len(STREAM_COLUMNS), np.nan)
+        trend_1h = recent_1h[-1] - recent_1h[0] \
+            if len(recent_1h) else np.full(len(STREAM_COLUMNS), np.nan)
+
+        w30, w1h, w2h, w4h = range(len(STREAM_WINDOWS))
+        temp, hum, pressure, soil = range(len(STREAM_COLUMNS))
+        hour_of_day = self.current_time.hour
+
+        return np.array([[
+            mean[w30, temp], std[w30, temp], range_30[temp],
+            mean[w1h, temp], std[w1h, temp], trend_1h[temp],
+            mean[w2h, temp], std[w2h, temp],
+            mean[w4h, temp], std[w4h, temp],
+            mean[w30, hum], std[w30, hum], range_30[hum],
+            mean[w1h, hum], std[w1h, hum], trend_1h[hum],
+            mean[w2h, hum], std[w2h, hum],
+            mean[w4h, hum], std[w4h, hum],
+            mean[w4h, pressure], std[w4h, pressure], trend_1h[pressure],
+            mean[w4h, soil], std[w4h, soil],
+            self.current[-1],
+            np.sin(2 * np.pi * hour_of_day / 24),
+            np.cos(2 * np.pi * hour_of_day / 24),
+            node_code(self.node_id),
+        ]])
+
+
+def _as_float(value):
+    """Sensor value as float, with missing values as NaN"""
+    return np.nan if value is None else float(value)
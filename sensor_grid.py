@@ -0,0 +1,175 @@
+"""
+5-Minute Grid Resampling
+Aligns every node's readings to a fixed 5-minute grid in one vectorized
+pass over the whole table, filling short gaps by bounded interpolation (or
+forward fill) and flagging the rest, so that a shift of k rows is exactly
+k * 5 minutes for feature windows and horizon targets alike
+"""
+
+import numpy as np
+import pandas as pd
+from sensor_features import MAX_LOOKBACK
+from sensor_window import SensorWindow
+
+GRID_MINUTES = 5
+READING_COLUMNS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+
+# Row flags (uint8): a real reading was snapped to the slot / the slot was imputed
+OBSERVED = 1
+FILLED = 2
+
+
+def _epoch_ns(values):
+    """Timestamps as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+def resample_to_grid(df, max_fill_steps=2, method='linear', grid_minutes=GRID_MINUTES,
+                     columns=READING_COLUMNS):
+    """
+    Snap readings to the grid and impute short gaps
+
+    Each reading moves to its nearest grid slot (the later one wins when
+    two land in the same slot). Each node's grid runs from its first to its
+    last reading; a run of empty slots no longer than `max_fill_steps` is
+    filled from the readings on either side, longer runs stay NaN.
+
+    Args:
+        df: sensor_logs DataFrame with node_id and created_at
+        max_fill_steps: Longest run of empty slots to impute
+        method: 'linear' (interpolate between the neighbouring readings) or 'ffill'
+        grid_minutes: Grid spacing
+        columns: Reading columns to carry over
+
+    Returns:
+        DataFrame sorted by node_id and created_at with one row per grid
+        slot: node_id, created_at (slot time, UTC), the reading columns and
+        boolean observed / filled / gap columns
+    """
+    if method not in ('linear', 'ffill'):
+        raise ValueError(f"Unknown fill method: {method}")
+    grid_ns = grid_minutes * 60 * 1_000_000_000
+    if len(df) == 0:
+        return pd.DataFrame(columns=['node_id', 'created_at'] + list(columns) + ['observed', 'filled', 'gap'])
+
+    codes, node_ids = pd.factorize(df['node_id'], sort=True)
+    times = _epoch_ns(df['created_at'])
+    slots = (times + grid_ns // 2) // grid_ns
+    values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+    # Order by node, slot and time; keep the last reading of every (node, slot)
+    order = np.lexsort((times, slots, codes))
+    codes, slots, values = codes[order], slots[order], values[order]
+    last = np.r_[(codes[1:] != codes[:-1]) | (slots[1:] != slots[:-1]), True]
+    codes, slots, values = codes[last], slots[last], values[last]
+
+    # Grid extent of every node, laid out back to back
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    first_slot = slots[starts]
+    lengths = slots[ends - 1] - first_slot + 1
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+    n = int(lengths.sum())
+    segment = np.repeat(np.arange(len(starts)), ends - starts)
+    position = offsets[segment] + slots - first_slot[segment]
+
+    grid = np.full((n, len(columns)), np.nan)
+    grid[position] = values
+    observed = np.zeros(n, dtype=bool)
+    observed[position] = True
+
+    # Nearest readings on either side; every node's grid starts and ends on one
+    index = np.arange(n)
+    prev = np.maximum.accumulate(np.where(observed, index, -1))
+    nxt = np.minimum.accumulate(np.where(observed, index, n)[::-1])[::-1]
+    filled = ~observed & (nxt - prev - 1 <= max_fill_steps)
+
+    rows = np.flatnonzero(filled)
+    before, after = prev[rows], nxt[rows]
+    if method == 'linear':
+        weight = ((rows - before) / (after - before))[:, None]
+        grid[rows] = grid[before] + weight * (grid[after] - grid[before])
+    else:
+        grid[rows] = grid[before]
+
+    row_node = np.repeat(np.arange(len(starts)), lengths)
+    row_slot = index - np.repeat(offsets, lengths) + np.repeat(first_slot, lengths)
+    node_values = node_ids[codes[starts]]
+
+    out = pd.DataFrame(grid, columns=list(columns))
+    out.insert(0, 'node_id', pd.Categorical.from_codes(row_node, categories=list(node_values)))
+    out.insert(1, 'created_at', pd.to_datetime(row_slot * grid_ns, unit='ns', utc=True))
+    out['observed'] = observed
+    out['filled'] = filled
+    out['gap'] = ~observed & ~filled
+    return out
+
+
+def resample_window(window, node_id, max_fill_steps=2, method='linear', min_slots=MAX_LOOKBACK + 1):
+    """
+    A serving window on the grid the models were trained on
+
+    Resamples one node's recent readings like resample_to_grid and keeps
+    only the slots after the last unfilled gap, so the newest row's
+    features never span a gap (training only uses gap-free lookbacks).
+
+    Args:
+        window: SensorWindow or DataFrame of one node's readings
+        min_slots: Fewest gap-free slots to return; the default is a full
+            lookback plus the current slot, as every training row has
+
+    Returns:
+        SensorWindow with one row per grid slot, or None if fewer than
+        `min_slots` slots follow the last gap
+    """
+    df = window.to_frame() if isinstance(window, SensorWindow) else window
+    grid = resample_to_grid(df.assign(node_id=node_id), max_fill_steps, method)
+    gaps = np.flatnonzero(grid['gap'].to_numpy())
+    if len(gaps):
+        grid = grid.iloc[gaps[-1] + 1:]
+    if len(grid) < min_slots:
+        return None
+    return SensorWindow.from_frame(grid, node_id)
+
+
+def grid_flags(node_df):
+    """OBSERVED/FILLED flags per row; frames that were not resampled are all observed"""
+    if 'observed' not in node_df:
+        return np.full(len(node_df), OBSERVED, dtype=np.uint8)
+    return (np.asarray(node_df['observed'], dtype=np.uint8) * OBSERVED
+            | np.asarray(node_df['filled'], dtype=np.uint8) * FILLED)
+
+
+def valid_rows(flags, steps, lookback=MAX_LOOKBACK, observed_targets=False):
+    """
+    Base rows usable for a horizon `steps` slots ahead
+
+    A row qualifies when its lookback window and the row itself contain no
+    unfilled gap and its target slot holds a value (or, with
+    observed_targets, a real reading, so scores are never taken against
+    imputed values).
+
+    Args:
+        flags: Row flags from grid_flags
+
+    Returns:
+        Row positions, ascending
+    """
+    flags = np.asarray(flags)
+    rows = np.arange(lookback, len(flags) - steps)
+    if len(rows) == 0:
+        return rows
+    gap = (flags & (OBSERVED | FILLED)) == 0
+    gaps_before = np.r_[0, np.cumsum(gap)]
+    clean = gaps_before[rows + 1] - gaps_before[rows - lookback] == 0
+    if observed_targets:
+        target_ok = (flags[rows + steps] & OBSERVED) != 0
+    else:
+        target_ok = ~gap[rows + steps]
+    return rows[clean & target_ok]
+
+
+def describe_grid(grid):
+    """One-line summary of a resampled table"""
+    return (f"{len(grid):,} slots, {int(grid['observed'].sum()):,} observed, "
+            f"{int(grid['filled'].sum()):,} filled, {int(grid['gap'].sum()):,} gaps")
@@ -0,0 +1,234 @@
+"""
+Columnar Sensor Store
+Node- and month-partitioned Arrow IPC files with typed float32 readings
+and int64 epoch timestamps, read through memory maps with partition pruning
+
+Layout:
+    <store>/node_id=<node>/month=<YYYY-MM>/part-0.arrow
+
+Usage:
+    python sensor_store.py compact sensor_logs.csv [sensor_store]
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DEFAULT_STORE_DIR = 'sensor_store'
+DEFAULT_SOURCE_CSV = 'sensor_logs.csv'
+PART_NAME = 'part-0.arrow'
+
+READING_COLUMNS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+
+SCHEMA = pa.schema(
+    [('id', pa.int64()), ('created_at', pa.int64())]           # created_at: ns since epoch, UTC
+    + [(column, pa.float32()) for column in READING_COLUMNS]
+)
+
+
+def _to_epoch_ns(values):
+    """Timestamps (strings or datetimes) as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+def _utc_timestamp(value):
+    """Timestamp in UTC, treating naive values as UTC"""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _partition_path(store_dir, node_id, month):
+    return os.path.join(store_dir, f'node_id={node_id}', f'month={month}', PART_NAME)
+
+
+def _read_partition(path, start_ns=None, end_ns=None, columns=None):
+    """Memory-map one partition and apply the time-range filter"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    mask = None
+    if start_ns is not None:
+        mask = pc.greater_equal(table['created_at'], start_ns)
+    if end_ns is not None:
+        upper = pc.less(table['created_at'], end_ns)
+        mask = upper if mask is None else pc.and_(mask, upper)
+    if mask is not None:
+        table = table.filter(mask)
+    if columns is not None:
+        table = table.select([c for c in SCHEMA.names if c in columns or c == 'created_at'])
+    return table
+
+
+def _write_partition(path, table):
+    """Write a partition atomically so readers never see a half-written file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def compact_sensor_logs(df, store_dir=DEFAULT_STORE_DIR):
+    """
+    Merge sensor rows into the partitioned store
+
+    Rows are grouped by node and month, merged with any existing partition
+    contents (deduplicated on id) and rewritten sorted by time.
+
+    Args:
+        df: DataFrame in the sensor_logs schema
+        store_dir: Store root directory
+
+    Returns:
+        Number of partitions written
+    """
+    df = df.copy()
+    df['created_at'] = _to_epoch_ns(df['created_at'])
+    df['month'] = pd.to_datetime(df['created_at'], unit='ns', utc=True).dt.strftime('%Y-%m')
+
+    written = 0
+    for (node_id, month), part in df.groupby(['node_id', 'month'], sort=True):
+        frame = pd.DataFrame({
+            'id': part['id'].to_numpy(dtype=np.int64),
+            'created_at': part['created_at'].to_numpy(dtype=np.int64),
+        })
+        for column in READING_COLUMNS:
+            frame[column] = pd.to_numeric(part[column], errors='coerce').to_numpy(dtype=np.float32)
+
+        path = _partition_path(store_dir, node_id, month)
+        if os.path.exists(path):
+            frame = pd.concat([_read_partition(path).to_pandas(), frame], ignore_index=True)
+
+        frame = frame.drop_duplicates('id', keep='last').sort_values('created_at', kind='stable')
+        _write_partition(path, pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False))
+        written += 1
+
+    return written
+
+
+def _matches_month(month, months):
+    """Month filter accepting month numbers (11) or 'YYYY-MM' strings"""
+    return any(
+        month == m if isinstance(m, str) else int(month[5:7]) == int(m)
+        for m in months
+    )
+
+
+def list_partitions(store_dir=DEFAULT_STORE_DIR, node_ids=None, months=None, start=None, end=None):
+    """
+    Partitions that can hold matching rows, pruned on node and month
+
+    Returns:
+        List of (node_id, month, path) tuples
+    """
+    start_month = _utc_timestamp(start).strftime('%Y-%m') if start is not None else None
+    end_month = _utc_timestamp(end).strftime('%Y-%m') if end is not None else None
+
+    partitions = []
+    if not os.path.isdir(store_dir):
+        return partitions
+
+    for node_dir in sorted(os.listdir(store_dir)):
+        if not node_dir.startswith('node_id='):
+            continue
+        node_id = node_dir[len('node_id='):]
+        if node_ids is not None and node_id not in node_ids:
+            continue
+
+        for month_dir in sorted(os.listdir(os.path.join(store_dir, node_dir))):
+            month = month_dir[len('month='):]
+            if months is not None and not _matches_month(month, months):
+                continue
+            if start_month is not None and month < start_month:
+                continue
+            if end_month is not None and month > end_month:
+                continue
+            path = _partition_path(store_dir, node_id, month)
+            if os.path.exists(path):
+                partitions.append((node_id, month, path))
+
+    return partitions
+
+
+def _frame_from_tables(tables, node_ids):
+    """Assemble partition tables into the sensor_logs DataFrame layout"""
+    if not tables:
+        return pd.DataFrame(columns=['node_id'] + SCHEMA.names)
+
+    frames = []
+    for table, node_id in zip(tables, node_ids):
+        frame = table.to_pandas()
+        frame.insert(1 if 'id' in frame else 0, 'node_id', node_id)
+        frames.append(frame)
+
+    df = pd.concat(frames, ignore_index=True)
+    df['node_id'] = df['node_id'].astype('category')
+    df['created_at'] = pd.to_datetime(df['created_at'].to_numpy(dtype=np.int64), unit='ns', utc=True)
+    return df
+
+
+def read_sensor_logs(store_dir=DEFAULT_STORE_DIR, node_ids=None, months=None,
+                     start=None, end=None, columns=None):
+    """
+    Read sensor rows from the store, touching only the matching partitions
+
+    Args:
+        store_dir: Store root directory
+        node_ids: Nodes to read (default: all)
+        months: Month numbers or 'YYYY-MM' strings to read (default: all)
+        start, end: Optional time range [start, end)
+        columns: Reading columns to load (default: all)
+
+    Returns:
+        DataFrame sorted by node_id and created_at
+    """
+    start_ns = int(_to_epoch_ns([start])[0]) if start is not None else None
+    end_ns = int(_to_epoch_ns([end])[0]) if end is not None else None
+
+    tables, table_nodes = [], []
+    for node_id, month, path in list_partitions(store_dir, node_ids, months, start, end):
+        tables.append(_read_partition(path, start_ns, end_ns, columns))
+        table_nodes.append(node_id)
+
+    return _frame_from_tables(tables, table_nodes)
+
+
+def load_sensor_logs(node_ids=None, months=None, start=None, end=None,
+                     store_dir=DEFAULT_STORE_DIR, source_csv=DEFAULT_SOURCE_CSV):
+    """
+    Sensor logs for the offline tooling
+
+    Reads the columnar store when it exists and falls back to parsing the
+    CSV export otherwise; both paths apply the same filters.
+
+    Returns:
+        DataFrame sorted by node_id and created_at
+    """
+    if os.path.isdir(store_dir) and list_partitions(store_dir):
+        return read_sensor_logs(store_dir, node_ids, months, start, end)
+
+    df = pd.read_csv(source_csv)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    if node_ids is not None:
+        df = df[df['node_id'].isin(node_ids)]
+    if months is not None:
+        month_keys = df['created_at'].dt.strftime('%Y-%m')
+        df = df[month_keys.map(lambda month: _matches_month(month, months))]
+    if start is not None:
+        df = df[df['created_at'] >= _utc_timestamp(start)]
+    if end is not None:
+        df = df[df['created_at'] < _utc_timestamp(end)]
+    return df.sort_values(['node_id', 'created_at']).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'compact':
+        print("Usage: python sensor_store.py compact <sensor_logs.csv> [store_dir]")
+        sys.exit(1)
+
+    store_dir = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_STORE_DIR
+    partitions = compact_sensor_logs(pd.read_csv(sys.argv[2]), store_dir)
+    print(f"✓ Compacted {sys.argv[2]} into {partitions} partition(s) under {store_dir}/")
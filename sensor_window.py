@@ -0,0 +1,126 @@
+"""
+Compact Sensor Windows
+Array-backed window of one node's recent readings: int64 epoch-ns
+timestamps, float32 reading columns and an int8 node code, about 36 bytes
+per reading instead of a DataFrame with object node_id/created_at columns
+"""
+
+import numpy as np
+import pandas as pd
+from sensor_features import node_code
+
+WINDOW_COLUMNS = ['temperature', 'humidity', 'pressure', 'altitude', 'soil_moisture']
+
+# id of readings pushed to /ingest that have not been read back from sensor_logs yet
+NO_ID = -1
+
+
+def _epoch_ns(values):
+    """Timestamps as int64 nanoseconds since epoch, UTC"""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit('ns').asi8
+
+
+class SensorWindow:
+    """
+    Time-ordered readings of a single node
+
+    Columns are read like a DataFrame's (window['temperature'],
+    window['created_at'] as epoch ns), slices return windows sharing the
+    same arrays, so build_feature_matrix and ExtendedHorizonPredictor take
+    a window wherever they take a node DataFrame.
+    """
+
+    __slots__ = ('node_id', 'node_code', 'ids', 'times', 'values')
+
+    def __init__(self, node_id, times, values, ids=None):
+        """
+        Args:
+            node_id: Node identifier
+            times: Reading times as int64 ns since epoch, ascending
+            values: (n, 5) readings in WINDOW_COLUMNS order
+            ids: sensor_logs ids, NO_ID for readings without one
+        """
+        self.node_id = node_id
+        self.node_code = np.int8(node_code(node_id))
+        self.times = np.asarray(times, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32).reshape(len(self.times), len(WINDOW_COLUMNS))
+        self.ids = (np.full(len(self.times), NO_ID, dtype=np.int64) if ids is None
+                    else np.asarray(ids, dtype=np.int64))
+
+    @classmethod
+    def from_frame(cls, df, node_id=None):
+        """Window from one node's sensor_logs rows (ids may be missing or NaN)"""
+        if node_id is None:
+            node_id = str(df['node_id'].iloc[0])
+        ids = None
+        if 'id' in df:
+            ids = pd.to_numeric(df['id'], errors='coerce').fillna(NO_ID).to_numpy(dtype=np.int64)
+        values = df.reindex(columns=WINDOW_COLUMNS).apply(pd.to_numeric, errors='coerce')
+        window = cls(node_id, _epoch_ns(df['created_at']), values.to_numpy(dtype=np.float32), ids)
+        return window.sorted()
+
+    @classmethod
+    def from_records(cls, node_id, rows):
+        """Window straight from sensor_logs row dicts, without a DataFrame"""
+        times = _epoch_ns([row['created_at'] for row in rows]) if rows else np.empty(0, dtype=np.int64)
+        values = np.array([
+            [np.nan if row.get(column) is None else row[column] for column in WINDOW_COLUMNS]
+            for row in rows
+        ], dtype=np.float32)
+        ids = [NO_ID if row.get('id') is None else row['id'] for row in rows]
+        return cls(node_id, times, values, ids).sorted()
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return SensorWindow(self.node_id, self.times[key], self.values[key], self.ids[key])
+        if key == 'created_at':
+            return self.times
+        if key == 'id':
+            return self.ids
+        if key == 'node_code':
+            return np.full(len(self.times), self.node_code, dtype=np.int8)
+        return self.values[:, WINDOW_COLUMNS.index(key)]
+
+    def __repr__(self):
+        return f"SensorWindow({self.node_id!r}, {len(self)} readings, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays"""
+        return self.times.nbytes + self.values.nbytes + self.ids.nbytes
+
+    @property
+    def latest_time(self):
+        """Time of the newest reading, as a UTC Timestamp"""
+        return pd.Timestamp(int(self.times[-1]), tz='UTC')
+
+    def sorted(self):
+        """Same readings in time order (self if already sorted)"""
+        if len(self.times) < 2 or np.all(self.times[1:] >= self.times[:-1]):
+            return self
+        order = np.argsort(self.times, kind='stable')
+        return SensorWindow(self.node_id, self.times[order], self.values[order], self.ids[order])
+
+    def merge(self, other):
+        """New window with another window's readings added, kept in time order"""
+        return SensorWindow(
+            self.node_id,
+            np.concatenate([self.times, other.times]),
+            np.concatenate([self.values, other.values]),
+            np.concatenate([self.ids, other.ids]),
+        ).sorted()
+
+    def since(self, start_ns):
+        """Readings at or after start_ns"""
+        return self[int(np.searchsorted(self.times, start_ns, side='left')):]
+
+    def to_frame(self):
+        """sensor_logs-shaped DataFrame (ids without a value are NaN)"""
+        df = pd.DataFrame(self.values, columns=WINDOW_COLUMNS)
+        df.insert(0, 'id', np.where(self.ids == NO_ID, np.nan, self.ids.astype(np.float64)))
+        df.insert(1, 'node_id', self.node_id)
+        df['created_at'] = pd.to_datetime(self.times, unit='ns', utc=True)
+        return df
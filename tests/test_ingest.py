@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import MicroBatchWriter
+
+
+def reading(i):
+    return {'node_id': 'node_1', 'temperature': float(i), 'humidity': None, 'pressure': None,
+            'altitude': None, 'soil_moisture': None, 'created_at': f'2025-11-20T00:{i:02d}:00+00:00'}
+
+
+class FakeClient:
+    """Supabase client stand-in; on_insert runs while the insert is in flight"""
+
+    def __init__(self):
+        self.inserted = []
+        self.on_insert = None
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self._rows = rows
+        return self
+
+    def execute(self):
+        if self.on_insert is not None:
+            on_insert, self.on_insert = self.on_insert, None
+            on_insert()
+        self.inserted.extend(self._rows)
+
+
+def manual_writer(client, **kwargs):
+    writer = MicroBatchWriter(client, flush_interval=3600, **kwargs)
+    # Keep the background flusher from starting so the test drives flush() itself
+    writer._stopped.set()
+    return writer
+
+
+def test_overflow_during_insert_keeps_unwritten_readings():
+    client = FakeClient()
+    writer = manual_writer(client, batch_size=4, max_pending=6)
+    writer.submit([reading(i) for i in range(4)])
+
+    # While readings 0-3 are being inserted, 4 more arrive and overflow trims 0 and 1
+    client.on_insert = lambda: writer.submit([reading(i) for i in range(4, 8)])
+    writer.flush()
+
+    assert [row['temperature'] for row in client.inserted] == [float(i) for i in range(8)]
+    assert writer.pending == 0
+    assert writer.dropped == 0
+    assert writer.written == 8
+
+
+def test_overflow_past_the_batch_counts_the_dropped_readings():
+    client = FakeClient()
+    writer = manual_writer(client, batch_size=2, max_pending=3)
+    writer.submit([reading(i) for i in range(2)])
+
+    # 0-1 are in flight; 2-6 arrive and overflow trims 0-3, so 2 and 3 are lost
+    client.on_insert = lambda: writer.submit([reading(i) for i in range(2, 7)])
+    writer.flush()
+
+    assert [row['temperature'] for row in client.inserted] == [0.0, 1.0, 4.0, 5.0, 6.0]
+    assert writer.dropped == 2
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_cache import ALL_HORIZONS, InMemoryPredictionCache, PredictionCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(clock, **kwargs):
+        if request.param == 'memory':
+            return InMemoryPredictionCache(clock=lambda: clock[0], **kwargs)
+        return PredictionCache(str(tmp_path / 'cache.sqlite3'), clock=lambda: clock[0], **kwargs)
+    return make
+
+
+def test_put_bumps_the_version_and_replaces_every_key(make_cache):
+    clock = [1000.0]
+    cache = make_cache(clock)
+    assert cache.put('node_1', {ALL_HORIZONS: 'all-1', '1h': 'h1-1', '4h': 'h4-1'}, 't1') == 1
+    assert cache.put('node_2', {ALL_HORIZONS: 'all-a'}, 't1') == 1
+    assert cache.put('node_1', {ALL_HORIZONS: 'all-2', '1h': 'h1-2'}, 't2') == 2
+
+    entry = cache.get('node_1', '1h')
+    assert (entry.body, entry.version, entry.prediction_time) == ('h1-2', 2, 't2')
+    assert cache.get('node_1', '4h') is None
+    assert cache.get('node_3') is None
+    assert cache.nodes() == {'node_1': 't2', 'node_2': 't1'}
+
+
+def test_entries_expire_after_the_ttl(make_cache):
+    clock = [1000.0]
+    cache = make_cache(clock, ttl=60)
+    cache.put('node_1', {ALL_HORIZONS: 'all'}, 't1')
+    clock[0] += 30
+    cache.put('node_2', {ALL_HORIZONS: 'all'}, 't2')
+
+    clock[0] += 30
+    assert cache.get('node_1').body == 'all'
+    clock[0] += 1
+    assert cache.get('node_1') is None
+    assert cache.nodes() == {'node_2': 't2'}
+
+
+def test_memo_serves_other_workers_runs_after_the_refresh_interval(tmp_path):
+    clock = [1000.0]
+    path = str(tmp_path / 'cache.sqlite3')
+    writer = PredictionCache(path, refresh_interval=1.0, clock=lambda: clock[0])
+    reader = PredictionCache(path, refresh_interval=1.0, clock=lambda: clock[0])
+
+    assert reader.get('node_1') is None
+    writer.put('node_1', {ALL_HORIZONS: 'all-1', '1h': 'h1-1'}, 't1')
+    # A miss is memoized too, until the refresh interval passes
+    assert reader.get('node_1') is None
+    clock[0] += 1.0
+    assert reader.get('node_1').version == 1
+    assert reader.get('node_1', '1h').body == 'h1-1'
+
+    writer.put('node_1', {ALL_HORIZONS: 'all-2'}, 't2')
+    # The writer serves its own run at once, including the dropped horizon
+    assert writer.get('node_1').version == 2
+    assert writer.get('node_1', '1h') is None
+    assert reader.get('node_1').version == 1
+    clock[0] += 1.0
+    assert reader.get('node_1').version == 2
+    assert reader.get('node_1', '1h') is None
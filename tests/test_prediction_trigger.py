@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_trigger import PredictionTrigger
+
+
+def manual_trigger(clock, **kwargs):
+    trigger = PredictionTrigger(lambda node_ids: None, clock=lambda: clock[0], **kwargs)
+    # Keep the worker from starting so the test takes due nodes itself
+    trigger._stopped = True
+    return trigger
+
+
+def notify_at(trigger, clock, when, node_ids):
+    clock[0] = when
+    return trigger.notify(node_ids)
+
+
+def test_bursts_are_debounced_and_coalesced_per_node():
+    clock = [0.0]
+    trigger = manual_trigger(clock, debounce=20, max_wait=120, min_interval=60)
+    for when in (0, 5, 10):
+        notify_at(trigger, clock, when, ['node_1'])
+    notify_at(trigger, clock, 12, ['node_2', 'node_1'])
+    assert sorted(trigger.pending) == ['node_1', 'node_2']
+
+    assert trigger._take_due(31.9) == ([], 32)
+    assert trigger._take_due(32) == (['node_1', 'node_2'], None)
+    assert trigger.pending == []
+
+
+def test_steady_readings_fire_after_max_wait():
+    clock = [0.0]
+    trigger = manual_trigger(clock, debounce=20, max_wait=120, min_interval=60)
+    for when in range(0, 200, 10):
+        notify_at(trigger, clock, when, ['node_1'])
+        due, _ = trigger._take_due(when)
+        if due:
+            break
+    assert (when, due) == (120, ['node_1'])
+
+
+def test_nodes_are_not_rerun_within_min_interval():
+    clock = [0.0]
+    trigger = manual_trigger(clock, debounce=20, max_wait=120, min_interval=60)
+    notify_at(trigger, clock, 0, ['node_1'])
+    assert trigger._take_due(20) == (['node_1'], None)
+
+    notify_at(trigger, clock, 25, ['node_1'])
+    assert trigger._take_due(45) == ([], 80)
+    assert trigger._take_due(80) == (['node_1'], None)
+
+
+def test_pending_nodes_are_bounded():
+    clock = [0.0]
+    trigger = manual_trigger(clock, max_pending=2)
+    assert notify_at(trigger, clock, 0, ['node_1', 'node_2', 'node_3']) == 2
+    assert notify_at(trigger, clock, 1, ['node_1']) == 1
+    assert trigger.dropped == 1
+    assert sorted(trigger.pending) == ['node_1', 'node_2']
+
+
+def test_worker_runs_due_nodes_in_one_call():
+    runs, done = [], threading.Event()
+
+    def run(node_ids):
+        runs.append(node_ids)
+        done.set()
+
+    trigger = PredictionTrigger(run, debounce=0, max_wait=0, min_interval=0)
+    trigger.notify(['node_2', 'node_1'])
+    assert done.wait(5)
+    trigger.close()
+    assert runs == [['node_1', 'node_2']]
+    assert trigger.runs == 1
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prediction_writer import SpoolingWriteQueue
+
+
+class FakeRest:
+    """AsyncSupabaseREST stand-in; inserts fail while `down` is set"""
+
+    def __init__(self):
+        self.inserted = []
+        self.down = False
+
+    async def insert(self, table, rows, on_conflict=None):
+        if self.down:
+            raise ConnectionError('database unreachable')
+        self.inserted.extend(rows)
+
+
+def row(i):
+    return {'node_id': 'node_1', 'horizon': '1h', 'target': 'temperature', 'value': float(i)}
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_failed_batch_spools_per_process_and_replays(tmp_path):
+    rest = FakeRest()
+    spool_path = str(tmp_path / 'spool.jsonl')
+    writer = SpoolingWriteQueue(rest, 'prediction_history', spool_path)
+
+    rest.down = True
+    try:
+        asyncio.run(writer.write([row(0), row(1)]))
+    except ConnectionError:
+        pass
+    assert os.listdir(tmp_path) == [f'spool.jsonl.{os.getpid()}']
+
+    rest.down = False
+    asyncio.run(writer.write([row(2)]))
+    assert [r['value'] for r in rest.inserted] == [2.0, 0.0, 1.0]
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay_claims_orphans_and_quarantines_bad_lines(tmp_path):
+    rest = FakeRest()
+    spool_path = str(tmp_path / 'spool.jsonl')
+    with open(f'{spool_path}.{exited_pid()}', 'w') as f:
+        f.write(json.dumps(row(1)) + '\n')
+        # Cut short by a crash mid-write
+        f.write(json.dumps(row(2))[:20])
+    # Spool of a worker that is still running is left alone
+    live_spool = f'{spool_path}.{os.getppid()}'
+    with open(live_spool, 'w') as f:
+        f.write(json.dumps(row(3)) + '\n')
+
+    writer = SpoolingWriteQueue(rest, 'prediction_history', spool_path)
+    asyncio.run(writer.write([row(0)]))
+
+    assert [r['value'] for r in rest.inserted] == [0.0, 1.0]
+    assert writer.quarantined == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(live_spool), 'spool.jsonl.bad'])
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rollups import RollupStore
+
+
+def frame(node_id, times):
+    return pd.DataFrame({
+        'node_id': node_id,
+        'created_at': pd.to_datetime(times, utc=True),
+        'temperature': 20.0, 'humidity': 50.0, 'pressure': 1000.0,
+        'altitude': 100.0, 'soil_moisture': 40.0,
+    })
+
+
+def test_late_readings_are_counted_not_folded_in():
+    store = RollupStore()
+    assert store.add('node_1', frame('node_1', ['2025-11-20 10:00', '2025-11-20 10:05'])) == 2
+
+    late = frame('node_1', ['2025-11-20 09:55', '2025-11-20 10:05', '2025-11-20 10:10'])
+    assert store.add('node_1', late) == 1
+    assert store.dropped == 2
+    assert sum(bucket['count'] for bucket in store.rollups('node_1', '1d')) == 3
+
+
+def test_backfill_keeps_the_last_days_of_each_node():
+    history = pd.concat([
+        frame('node_1', pd.date_range('2025-11-01', '2025-11-10', freq='1D')),
+        frame('node_2', pd.date_range('2025-10-01', '2025-10-05', freq='1D')),
+    ])
+    store = RollupStore()
+
+    assert store.backfill(history, days=2) == 6
+    assert [bucket['time'][:10] for bucket in store.rollups('node_2', '1d', start='2025-09-01')] == [
+        '2025-10-03', '2025-10-04', '2025-10-05'
+    ]
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_features import (MAX_LOOKBACK, N_FEATURES, NodeFeatureState, build_feature_matrix,
+                             fill_feature_matrix)
+
+
+def synthetic_node(n=400, seed=7):
+    """5-minute readings with skipped slots, missing values and a flat pressure stretch"""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('2025-11-20', periods=n + 40, freq='5min', tz='UTC')
+    times = times.delete(rng.choice(len(times), 40, replace=False))
+    df = pd.DataFrame({
+        'node_id': 'node_2',
+        'temperature': 24 + 3 * np.sin(np.arange(n) / 40) + rng.normal(0, 0.2, n),
+        'humidity': 60 + rng.normal(0, 2, n),
+        'pressure': 1010 + np.cumsum(rng.normal(0, 0.05, n)),
+        'altitude': 120 + rng.normal(0, 0.5, n),
+        'soil_moisture': 40 + rng.normal(0, 1, n),
+        'created_at': times,
+    })
+    df.loc[50:70, 'humidity'] = np.nan
+    df.loc[rng.choice(n, 15, replace=False), 'soil_moisture'] = np.nan
+    df.loc[150:250, 'pressure'] = 1011.0
+    df.loc[[100, 101, 300], 'temperature'] = np.nan
+    return df
+
+
+def legacy_features(node_df, i, node_id):
+    """Per-row iloc features as the original visualization scripts built them"""
+    w30, w1h, w2h, w4h = (node_df.iloc[i - size:i] for size in (6, 12, 24, 48))
+    hour = node_df['created_at'].iloc[i].hour
+    return [
+        w30['temperature'].mean(), w30['temperature'].std() or 0,
+        w30['temperature'].max() - w30['temperature'].min(),
+        w1h['temperature'].mean(), w1h['temperature'].std() or 0,
+        w1h['temperature'].iloc[-1] - w1h['temperature'].iloc[0],
+        w2h['temperature'].mean(), w2h['temperature'].std() or 0,
+        w4h['temperature'].mean(), w4h['temperature'].std() or 0,
+        w30['humidity'].mean(), w30['humidity'].std() or 0,
+        w30['humidity'].max() - w30['humidity'].min(),
+        w1h['humidity'].mean(), w1h['humidity'].std() or 0,
+        w1h['humidity'].iloc[-1] - w1h['humidity'].iloc[0],
+        w2h['humidity'].mean(), w2h['humidity'].std() or 0,
+        w4h['humidity'].mean(), w4h['humidity'].std() or 0,
+        w4h['pressure'].mean(), w4h['pressure'].std() or 0,
+        w1h['pressure'].iloc[-1] - w1h['pressure'].iloc[0],
+        w4h['soil_moisture'].mean(), w4h['soil_moisture'].std() or 0,
+        node_df['altitude'].iloc[i],
+        np.sin(2 * np.pi * hour / 24), np.cos(2 * np.pi * hour / 24),
+        1 if node_id == 'node_2' else 0,
+    ]
+
+
+def test_matches_legacy_per_row_features():
+    df = synthetic_node()
+    features = build_feature_matrix(df, 'node_2')
+    rows = range(MAX_LOOKBACK, len(df))
+    expected = np.array([legacy_features(df, i, 'node_2') for i in rows])
+    np.testing.assert_allclose(features[MAX_LOOKBACK:], expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_chunked_fill_matches_one_shot():
+    df = synthetic_node()
+    expected = build_feature_matrix(df, 'node_2')
+    for chunk_rows in (1, 7, MAX_LOOKBACK, 100, len(df)):
+        out = np.full((len(df), N_FEATURES), -1.0)
+        fill_feature_matrix(out, df, 'node_2', chunk_rows=chunk_rows)
+        np.testing.assert_array_equal(out, expected)
+
+
+def test_streaming_state_matches_batch_rows():
+    df = synthetic_node()
+    expected = build_feature_matrix(df, 'node_2')
+    state = NodeFeatureState('node_2')
+    assert state.features() is None
+    for i, reading in enumerate(df.to_dict('records')):
+        state.update(reading)
+        np.testing.assert_allclose(state.features()[0], expected[i], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=f'row {i}')
+
+    # Replaying the tail gives the same state as streaming every row
+    warm = NodeFeatureState.from_frame(df, 'node_2')
+    np.testing.assert_allclose(warm.features()[0], expected[-1], rtol=1e-9, atol=1e-9, equal_nan=True)
@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_features import MAX_LOOKBACK
+from sensor_grid import FILLED, OBSERVED, grid_flags, resample_to_grid, resample_window, valid_rows
+from sensor_window import SensorWindow
+
+START = pd.Timestamp('2025-11-20 00:00', tz='UTC')
+
+
+def readings(node_id, minutes, temperature=None):
+    minutes = np.asarray(minutes, dtype=np.float64)
+    return pd.DataFrame({
+        'node_id': node_id,
+        'created_at': START + pd.to_timedelta(minutes, unit='min'),
+        'temperature': minutes if temperature is None else temperature,
+        'humidity': 60.0, 'pressure': 1010.0, 'altitude': 100.0, 'soil_moisture': 40.0,
+    })
+
+
+def test_readings_snap_to_the_nearest_slot_and_the_later_one_wins():
+    grid = resample_to_grid(readings('node_1', [0.5, 4.0, 6.0, 9.5]))
+
+    assert list(grid['created_at']) == [START + pd.Timedelta(minutes=m) for m in (0, 5, 10)]
+    assert list(grid['temperature']) == [0.5, 6.0, 9.5]
+    assert grid['observed'].all() and not grid['filled'].any()
+
+
+def test_short_gaps_are_filled_and_long_ones_flagged():
+    # Slots 2-3 are missing (filled); slots 6-8 are missing (one too many)
+    df = pd.concat([
+        readings('node_2', [0, 5, 20, 25, 45]),
+        readings('node_1', [0, 5]),
+    ])
+    grid = resample_to_grid(df, max_fill_steps=2)
+
+    assert list(grid['node_id']) == ['node_1'] * 2 + ['node_2'] * 10
+    node_2 = grid[grid['node_id'] == 'node_2'].reset_index(drop=True)
+    np.testing.assert_allclose(node_2['temperature'][:6], [0, 5, 10, 15, 20, 25])
+    assert list(node_2.index[node_2['filled']]) == [2, 3]
+    assert list(node_2.index[node_2['gap']]) == [6, 7, 8]
+    assert node_2['temperature'][6:9].isna().all()
+
+    ffill = resample_to_grid(df, max_fill_steps=2, method='ffill')
+    assert list(ffill[ffill['node_id'] == 'node_2']['temperature'][2:4]) == [5.0, 5.0]
+
+
+def test_resample_window_keeps_the_slots_after_the_last_gap():
+    minutes = [0, 5] + list(range(30, 30 + 5 * (MAX_LOOKBACK + 1), 5))
+    df = readings('node_1', minutes)
+    window = resample_window(SensorWindow.from_frame(df, 'node_1'), 'node_1')
+
+    assert isinstance(window, SensorWindow)
+    assert len(window) == MAX_LOOKBACK + 1
+    assert window.to_frame()['temperature'].iloc[0] == 30.0
+
+
+def test_resample_window_without_a_full_lookback_is_skipped():
+    minutes = list(range(0, 5 * MAX_LOOKBACK, 5))
+    assert resample_window(readings('node_1', minutes), 'node_1') is None
+    # Filling a short gap counts towards the lookback
+    filled = [m for m in range(0, 5 * (MAX_LOOKBACK + 1), 5) if m not in (50, 55)]
+    assert len(resample_window(readings('node_1', filled), 'node_1')) == MAX_LOOKBACK + 1
+
+
+def test_valid_rows_skip_gaps_in_the_lookback_and_the_target():
+    n = 120
+    flags = np.full(n, OBSERVED, dtype=np.uint8)
+    flags[60] = 0               # Unfilled gap
+    flags[114] = FILLED
+
+    rows = valid_rows(flags, steps=5)
+    assert rows[0] == MAX_LOOKBACK and rows[-1] == n - 6
+    # A row is unusable while the gap is its target, the row itself or in its lookback
+    assert not ({55} | set(range(60, 60 + MAX_LOOKBACK + 1))) & set(rows)
+    assert {54, 56, 59, 60 + MAX_LOOKBACK + 1} <= set(rows)
+    assert 109 in rows and 109 not in valid_rows(flags, steps=5, observed_targets=True)
+
+    assert len(valid_rows(flags[:MAX_LOOKBACK + 5], steps=5)) == 0
+    assert list(grid_flags(readings('node_1', [0, 5]))) == [OBSERVED, OBSERVED]
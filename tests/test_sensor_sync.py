@@ -0,0 +1,81 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_sync import SENSOR_COLUMNS, FrameSensorSource, SensorSync
+
+NOW = datetime(2025, 11, 20, 12, 0, tzinfo=timezone.utc)
+
+
+class RecordingSource(FrameSensorSource):
+    """FrameSensorSource that remembers the arguments of every fetch"""
+
+    def __init__(self, df):
+        super().__init__(df)
+        self.calls = []
+
+    def fetch(self, after_id=None, since=None, node_ids=None):
+        self.calls.append({'after_id': after_id, 'since': since})
+        return super().fetch(after_id, since, node_ids)
+
+
+def readings(node_id, start_id, times):
+    return [
+        {'id': start_id + i, 'node_id': node_id, 'temperature': 25.0, 'humidity': 60.0,
+         'pressure': 1010.0, 'altitude': 100.0, 'soil_moisture': 40.0, 'created_at': time.isoformat()}
+        for i, time in enumerate(times)
+    ]
+
+
+def test_empty_backfill_keeps_fetching_by_time():
+    # Old history only: the backfill finds nothing inside the window
+    source = RecordingSource(pd.DataFrame(
+        readings('node_1', 1, [NOW - timedelta(days=30, minutes=5 * i) for i in range(100)]),
+        columns=SENSOR_COLUMNS
+    ))
+    clock = [NOW]
+    sync = SensorSync(source, window_hours=4, clock=lambda: clock[0])
+
+    assert sync.sync() == {}
+    assert sync.last_id is None
+
+    clock[0] = NOW + timedelta(minutes=1)
+    source.append(readings('node_1', 101, [clock[0]]))
+    added = sync.sync()
+
+    assert source.calls[-1] == {'after_id': None, 'since': clock[0] - timedelta(hours=4)}
+    assert list(added) == ['node_1'] and len(added['node_1']) == 1
+    assert sync.last_id == 101
+
+
+def test_stale_node_drops_out_of_the_window():
+    source = RecordingSource(pd.DataFrame(
+        readings('node_1', 1, [NOW - timedelta(minutes=5 * i) for i in range(12)])
+        + readings('node_2', 100, [NOW - timedelta(minutes=5 * i) for i in range(12)]),
+        columns=SENSOR_COLUMNS
+    ))
+    clock = [NOW]
+    sync = SensorSync(source, window_hours=4, clock=lambda: clock[0])
+    sync.sync()
+    assert set(sync.frames()) == {'node_1', 'node_2'}
+
+    # Only node_1 keeps reporting; node_2's last reading ages past the window
+    for hour in range(1, 6):
+        clock[0] = NOW + timedelta(hours=hour)
+        source.append(readings('node_1', 1000 + hour, [clock[0]]))
+        sync.sync()
+
+    frames = sync.frames()
+    assert set(frames) == {'node_1'}
+    threshold = pd.Timestamp(clock[0] - timedelta(hours=4)).value
+    assert frames['node_1'].times.min() >= threshold
+
+    # Once every node has gone quiet nothing is left to predict from
+    for _ in range(5):
+        clock[0] += timedelta(hours=1)
+        sync.sync()
+    assert sync.frames() == {}
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_features import MAX_LOOKBACK, build_feature_matrix
+from sensor_grid import resample_to_grid
+from train_extended_horizon import XGB_PARAMS, train_shared_matrix_models
+from tree_inference import OUTPUT_COLUMNS, _fold_thresholds, compile_horizon
+
+TINY_PARAMS = dict(XGB_PARAMS, n_estimators=15, max_depth=4)
+
+
+def synthetic_logs(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for node_id in ('node_1', 'node_2'):
+        t = np.arange(n)
+        frames.append(pd.DataFrame({
+            'node_id': node_id,
+            'temperature': 25 + 4 * np.sin(t / 60) + rng.normal(0, 0.3, n),
+            'humidity': 65 - 10 * np.sin(t / 60) + rng.normal(0, 1.5, n),
+            'pressure': 1009 + np.cumsum(rng.normal(0, 0.05, n)),
+            'altitude': 110 + rng.normal(0, 0.5, n),
+            'soil_moisture': 40 + rng.normal(0, 1, n),
+            'created_at': pd.date_range('2025-11-20', periods=n, freq='5min', tz='UTC'),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    # Missing values exercise the default split directions
+    df.loc[rng.choice(len(df), 40, replace=False), 'humidity'] = np.nan
+    return df
+
+
+def xgboost_outputs(models, quantile_models, features):
+    """(N, 5) OUTPUT_COLUMNS predictions straight from the boosters"""
+    scaled = models['scaler'].transform(features)
+    if 'multi' in models:
+        multi = models['multi'].inplace_predict(scaled).reshape(len(scaled), -1)
+        points = [multi[:, models['targets'].index(name)] for name in ('temp', 'hum', 'soil')]
+    else:
+        points = [models[name].inplace_predict(scaled) for name in ('temp', 'hum', 'soil')]
+    if 'quantiles' in quantile_models:
+        bands = quantile_models['quantiles'].inplace_predict(scaled).reshape(len(scaled), -1)
+        quantiles = [bands[:, quantile_models['alphas'].index(alpha)] for alpha in (0.1, 0.9)]
+    else:
+        quantiles = [quantile_models[name].inplace_predict(scaled) for name in ('q10', 'q90')]
+    return np.column_stack(points + quantiles)
+
+
+@pytest.mark.parametrize('multi_output', [False, True])
+def test_compiled_matches_xgboost(multi_output):
+    df = resample_to_grid(synthetic_logs())
+    models, quantile_models = train_shared_matrix_models(
+        df, {'1h': 12}, ['node_1', 'node_2'], params=TINY_PARAMS, multi_output=multi_output
+    )
+    node_df = df[df['node_id'] == 'node_2'].reset_index(drop=True)
+    features = build_feature_matrix(node_df, 'node_2')[MAX_LOOKBACK:]
+    assert np.isnan(features).any()
+
+    expected = xgboost_outputs(models['1h'], quantile_models['1h'], features)
+    for fold_scaler in (True, False):
+        ensemble = compile_horizon(models['1h'], quantile_models['1h'], fold_scaler=fold_scaler)
+        X = features if fold_scaler else models['1h']['scaler'].transform(features)
+        predicted = ensemble.predict(X)
+        assert predicted.shape == (len(features), len(OUTPUT_COLUMNS))
+        np.testing.assert_allclose(predicted, expected, rtol=1e-5, atol=1e-4)
+
+
+def test_folded_thresholds_split_exactly_where_xgboost_does():
+    rng = np.random.default_rng(11)
+    n = 5000
+    features = rng.integers(0, 4, n)
+    mean = np.array([25.0, -3.5, 1013.25, 1e-3])
+    scale = np.array([3.2, 0.07, 4.1, 2.5e-5])
+    raw = mean[features] + scale[features] * rng.normal(0, 2, n)
+    # Thresholds sitting exactly on the scaled value of a raw reading
+    thresholds = ((raw - mean[features]) / scale[features]).astype(np.float32).astype(np.float64)
+
+    cuts = _fold_thresholds(thresholds, features, mean, scale)
+
+    def goes_left(x):
+        return ((x - mean[features]) / scale[features]).astype(np.float32) < thresholds.astype(np.float32)
+
+    assert not goes_left(cuts).any()
+    assert goes_left(np.nextafter(cuts, -np.inf)).all()
+    assert not goes_left(raw).any()
+    # Anywhere around the cut, x < cut agrees with XGBoost's float32 comparison
+    for step in (-3, -1, 1, 3):
+        x = cuts + step * np.spacing(cuts)
+        np.testing.assert_array_equal(x < cuts, goes_left(x))
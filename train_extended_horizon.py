@@ -0,0 +1,429 @@
+"""
+Extended Horizon Model Training
+Builds the feature matrix once and trains temperature, humidity and soil
+moisture models plus q10/q90 temperature quantile models for every
+horizon, writing the extended_horizon_models.pkl that app.py loads
+
+Usage:
+    python train_extended_horizon.py --horizons 1h 4h 6h 12h --workers 4 --n-jobs 2
+    python train_extended_horizon.py --chunked --external-memory xgb_cache  # history larger than RAM
+"""
+
+import os
+import time
+import pickle
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+from sensor_features import HORIZON_STEPS, MAX_LOOKBACK, TARGET_COLUMNS, build_feature_matrix
+from sensor_store import list_partitions, load_sensor_logs
+from sensor_grid import describe_grid, grid_flags, resample_to_grid, valid_rows
+from feature_cache import CHUNK_ROWS, DEFAULT_CACHE_DIR, cached_node_arrays, streamed_node_arrays
+
+# Same settings as the visualization scripts
+XGB_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 5,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'random_state': 42,
+    'verbosity': 0,
+}
+
+# Model name -> target column in the stored layout ExtendedHorizonPredictor expects
+POINT_MODELS = {'temp': 'temperature', 'hum': 'humidity', 'soil': 'soil_moisture'}
+QUANTILE_MODELS = {'q10': 0.1, 'q90': 0.9}
+
+
+def build_node_matrices(df, node_ids, cache_dir=None):
+    """
+    Feature matrix and raw targets for each node, built once for all horizons
+
+    Args:
+        cache_dir: Feature cache directory; matrices are reused from (and
+            saved to) it when given
+
+    Returns:
+        Dict of node_id -> (features, targets, flags) with targets in
+        TARGET_COLUMNS order and sensor_grid row flags
+    """
+    if cache_dir is not None:
+        return {
+            node_id: (features, targets, flags)
+            for node_id, (features, targets, _, flags) in cached_node_arrays(df, node_ids, cache_dir).items()
+        }
+
+    matrices = {}
+    for node_id in node_ids:
+        node_df = df[df['node_id'] == node_id].reset_index(drop=True)
+        matrices[node_id] = (
+            build_feature_matrix(node_df, node_id),
+            node_df[TARGET_COLUMNS].to_numpy(dtype=np.float64),
+            grid_flags(node_df),
+        )
+    return matrices
+
+
+def horizon_dataset(matrices, steps):
+    """
+    Stack every node's rows for one horizon by shifting the shared targets
+
+    Returns:
+        (X, y) with y columns in TARGET_COLUMNS order
+    """
+    X_parts, y_parts = [], []
+    for features, targets, flags in matrices.values():
+        rows = valid_rows(flags, steps)
+        X_parts.append(features[rows])
+        y_parts.append(targets[rows + steps])
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def fit_model(X, y, params, quantile_alpha=None):
+    """Fit one XGBoost regressor (squared error, or quantile if alpha is given)"""
+    if quantile_alpha is None:
+        model = xgb.XGBRegressor(**params)
+    else:
+        model = xgb.XGBRegressor(objective='reg:quantileerror', quantile_alpha=quantile_alpha, **params)
+    return model.fit(X, y)
+
+
+def train_extended_horizon_models(df, horizons, node_ids, workers=4, n_jobs=1,
+                                  tree_method='hist', params=None, cache_dir=None):
+    """
+    Train every model for every horizon in parallel
+
+    Args:
+        df: Sensor DataFrame sorted by node_id and created_at
+        horizons: Dict of horizon -> forecast steps
+        node_ids: Nodes to train on
+        workers: Models trained concurrently
+        n_jobs: XGBoost threads per model
+        tree_method: XGBoost tree method
+        params: XGBoost parameters (default XGB_PARAMS)
+        cache_dir: Optional feature cache directory
+
+    Returns:
+        (models, quantile_models) in the layout of extended_horizon_models.pkl
+    """
+    params = dict(params or XGB_PARAMS, n_jobs=n_jobs, tree_method=tree_method)
+    matrices = build_node_matrices(df, node_ids, cache_dir)
+
+    models, quantile_models = {}, {}
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for horizon, steps in horizons.items():
+            X, y = horizon_dataset(matrices, steps)
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
+            models[horizon] = {'scaler': scaler}
+            quantile_models[horizon] = {}
+            print(f"  {horizon}: {len(X):,} samples")
+
+            for name, target in POINT_MODELS.items():
+                y_target = y[:, TARGET_COLUMNS.index(target)]
+                futures.append((models[horizon], name,
+                                pool.submit(fit_model, X_scaled, y_target, params)))
+            for name, alpha in QUANTILE_MODELS.items():
+                y_temp = y[:, TARGET_COLUMNS.index('temperature')]
+                futures.append((quantile_models[horizon], name,
+                                pool.submit(fit_model, X_scaled, y_temp, params, alpha)))
+
+        for group, name, future in futures:
+            group[name] = future.result()
+
+    return models, quantile_models
+
+
+def native_params(params):
+    """XGBRegressor-style parameters as (xgb.train params, boosting rounds)"""
+    params = dict(params)
+    return params, params.pop('n_estimators', 100)
+
+
+def shifted_targets(matrices, steps):
+    """
+    Targets `steps` ahead for every base row of every node
+
+    Base rows are all rows with a full lookback, so the same quantized
+    matrix serves every horizon; rows whose target lies past the end of
+    the node's data (or is missing), or whose window or target falls in a
+    grid gap, get weight 0.
+
+    Returns:
+        (y, weight) with y columns in TARGET_COLUMNS order
+    """
+    y_parts, weight_parts = [], []
+    for features, targets, flags in matrices.values():
+        rows = np.arange(MAX_LOOKBACK, len(features))
+        y = np.zeros((len(rows), len(TARGET_COLUMNS)))
+        has_target = rows + steps < len(features)
+        y[has_target] = targets[rows[has_target] + steps]
+        gap_free = np.zeros(len(rows), dtype=bool)
+        gap_free[valid_rows(flags, steps) - MAX_LOOKBACK] = True
+        valid = has_target & gap_free & ~np.isnan(y).any(axis=1)
+        y[~valid] = 0.0
+        y_parts.append(y)
+        weight_parts.append(valid.astype(np.float64))
+    return np.concatenate(y_parts), np.concatenate(weight_parts)
+
+
+def train_shared_matrix_models(df, horizons, node_ids, n_jobs=1, tree_method='hist',
+                               params=None, multi_output=False, cache_dir=None):
+    """
+    Train every horizon from one quantized matrix
+
+    The feature matrix is scaled and binned into a single QuantileDMatrix
+    once; each horizon and target only swaps labels and weights on it.
+    Models are trained one after another (they share the matrix) using
+    `n_jobs` threads each. With multi_output, temp/hum/soil are learned
+    by one multi-output tree model and q10/q90 by one multi-quantile
+    model, so each horizon has two boosters instead of five.
+
+    Returns:
+        (models, quantile_models) in the layout of extended_horizon_models.pkl
+    """
+    params, num_rounds = native_params(dict(params or XGB_PARAMS, n_jobs=n_jobs, tree_method=tree_method))
+    matrices = build_node_matrices(df, node_ids, cache_dir)
+
+    X = np.concatenate([features[MAX_LOOKBACK:] for features, _, _ in matrices.values()])
+    scaler = StandardScaler()
+    dtrain = xgb.QuantileDMatrix(scaler.fit_transform(X), max_bin=params.get('max_bin', 256))
+    return train_on_shared_matrix(dtrain, scaler, matrices, horizons, params, num_rounds, multi_output)
+
+
+def train_on_shared_matrix(dtrain, scaler, matrices, horizons, params, num_rounds, multi_output=False):
+    """
+    Train every horizon on a matrix holding the scaled base rows of `matrices`
+
+    Returns:
+        (models, quantile_models) in the layout of extended_horizon_models.pkl
+    """
+    temp_column = TARGET_COLUMNS.index('temperature')
+
+    models, quantile_models = {}, {}
+    for horizon, steps in horizons.items():
+        y, weight = shifted_targets(matrices, steps)
+        dtrain.set_weight(weight)
+        print(f"  {horizon}: {int(weight.sum()):,} samples")
+
+        models[horizon] = {'scaler': scaler}
+        if multi_output:
+            dtrain.set_label(y[:, [TARGET_COLUMNS.index(t) for t in POINT_MODELS.values()]])
+            models[horizon]['multi'] = xgb.train(
+                dict(params, multi_strategy='multi_output_tree'), dtrain, num_rounds
+            )
+            models[horizon]['targets'] = list(POINT_MODELS)
+        else:
+            for name, target in POINT_MODELS.items():
+                dtrain.set_label(y[:, TARGET_COLUMNS.index(target)])
+                models[horizon][name] = xgb.train(params, dtrain, num_rounds)
+
+        dtrain.set_label(y[:, temp_column])
+        quantile_params = dict(params, objective='reg:quantileerror')
+        if multi_output:
+            alphas = list(QUANTILE_MODELS.values())
+            quantile_models[horizon] = {
+                'quantiles': xgb.train(dict(quantile_params, quantile_alpha=np.array(alphas)),
+                                       dtrain, num_rounds),
+                'alphas': alphas,
+            }
+        else:
+            quantile_models[horizon] = {
+                name: xgb.train(dict(quantile_params, quantile_alpha=alpha), dtrain, num_rounds)
+                for name, alpha in QUANTILE_MODELS.items()
+            }
+
+    return models, quantile_models
+
+
+class FeatureBatchIter(xgb.DataIter):
+    """
+    Feeds the base rows of memory-mapped node matrices to XGBoost in batches
+
+    Rows come in shifted_targets order (node by node, MAX_LOOKBACK onwards)
+    and are scaled batch by batch, so only one batch is ever materialized.
+    """
+
+    def __init__(self, matrices, scaler, batch_rows=CHUNK_ROWS, cache_prefix=None):
+        self._batches = [
+            (features, start, min(start + batch_rows, len(features)))
+            for features, _, _ in matrices.values()
+            for start in range(MAX_LOOKBACK, len(features), batch_rows)
+        ]
+        self._scaler = scaler
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._position == len(self._batches):
+            return False
+        features, start, stop = self._batches[self._position]
+        input_data(data=self._scaler.transform(np.asarray(features[start:stop])))
+        self._position += 1
+        return True
+
+    def reset(self):
+        self._position = 0
+
+
+def fit_batch_scaler(matrices, batch_rows=CHUNK_ROWS):
+    """StandardScaler over every base row, fitted batch by batch"""
+    scaler = StandardScaler()
+    for features, _, _ in matrices.values():
+        for start in range(MAX_LOOKBACK, len(features), batch_rows):
+            scaler.partial_fit(np.asarray(features[start:start + batch_rows]))
+    return scaler
+
+
+def train_chunked_models(load_node, horizons, node_ids, n_jobs=1, tree_method='hist', params=None,
+                         multi_output=False, cache_dir=DEFAULT_CACHE_DIR, chunk_rows=CHUNK_ROWS,
+                         external_memory_dir=None):
+    """
+    Shared-matrix training for histories larger than memory
+
+    Each node's rows are loaded on their own through load_node(node_id),
+    turned into features chunk by chunk straight into the memory-mapped
+    feature cache, and streamed into XGBoost through FeatureBatchIter. By
+    default the batches are binned into an in-memory QuantileDMatrix (one
+    byte per value instead of the float64 features); with
+    external_memory_dir the binned pages are spilled to disk as well.
+
+    Args:
+        load_node: Callable returning one node's (resampled) rows
+        chunk_rows: Rows per feature chunk and per XGBoost batch
+        external_memory_dir: Directory for XGBoost's external-memory cache
+
+    Returns:
+        (models, quantile_models) in the layout of extended_horizon_models.pkl
+    """
+    params, num_rounds = native_params(dict(params or XGB_PARAMS, n_jobs=n_jobs, tree_method=tree_method))
+    matrices = {
+        node_id: (features, targets, flags)
+        for node_id, (features, targets, _, flags)
+        in streamed_node_arrays(load_node, node_ids, cache_dir, chunk_rows).items()
+    }
+    scaler = fit_batch_scaler(matrices, chunk_rows)
+
+    if external_memory_dir is None:
+        dtrain = xgb.QuantileDMatrix(FeatureBatchIter(matrices, scaler, chunk_rows),
+                                     max_bin=params.get('max_bin', 256))
+        return train_on_shared_matrix(dtrain, scaler, matrices, horizons, params, num_rounds, multi_output)
+
+    os.makedirs(external_memory_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=external_memory_dir) as pages:
+        dtrain = xgb.DMatrix(FeatureBatchIter(matrices, scaler, chunk_rows, os.path.join(pages, 'dtrain')))
+        print(f"✓ External-memory matrix: {dtrain.num_row():,} rows paged under {external_memory_dir}/")
+        result = train_on_shared_matrix(dtrain, scaler, matrices, horizons, params, num_rounds, multi_output)
+        del dtrain
+    return result
+
+
+def train_chunked(args, horizons):
+    """--chunked: nodes are loaded, resampled and cached one at a time"""
+    node_ids = args.nodes or sorted({node_id for node_id, _, _ in list_partitions(months=args.months)})
+    if not node_ids:
+        # No columnar store: the CSV export is parsed whole anyway
+        node_ids = sorted(load_sensor_logs(months=args.months)['node_id'].unique())
+
+    def load_node(node_id):
+        node_df = load_sensor_logs(node_ids=[node_id], months=args.months)
+        print(f"✓ Loaded {len(node_df):,} records for {node_id}")
+        if not args.no_resample and len(node_df):
+            node_df = resample_to_grid(node_df, max_fill_steps=args.max_fill_steps)
+            print(f"✓ Resampled to 5-minute grid: {describe_grid(node_df)}")
+        return node_df
+
+    return train_chunked_models(
+        load_node, horizons, node_ids,
+        n_jobs=args.n_jobs, tree_method=args.tree_method, multi_output=args.multi_output,
+        cache_dir=args.feature_cache or DEFAULT_CACHE_DIR, chunk_rows=args.chunk_rows,
+        external_memory_dir=args.external_memory
+    )
+
+
+def save_models(args, models, quantile_models, horizons):
+    """Write the pickle (and the model store if --store was given)"""
+    with open(args.output, 'wb') as f:
+        pickle.dump({'models': models, 'quantile_models': quantile_models, 'horizons': horizons}, f)
+    print(f"✓ Saved: {args.output}")
+
+    if args.store:
+        from model_store import save_model_store
+        save_model_store(models, quantile_models, horizons, args.store)
+        print(f"✓ Saved model store: {args.store}/")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train extended horizon XGBoost models')
+    parser.add_argument('--horizons', nargs='+', default=list(HORIZON_STEPS))
+    parser.add_argument('--nodes', nargs='+', default=None)
+    parser.add_argument('--months', nargs='+', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=4, help='models trained concurrently')
+    parser.add_argument('--n-jobs', type=int, default=1, help='XGBoost threads per model')
+    parser.add_argument('--tree-method', default='hist')
+    parser.add_argument('--output', default='extended_horizon_models.pkl')
+    parser.add_argument('--store', default=None, help='also write a compact model store here')
+    parser.add_argument('--shared-matrix', action='store_true',
+                        help='bin the features once and reuse them for every target and horizon')
+    parser.add_argument('--multi-output', action='store_true',
+                        help='one multi-output model for temp/hum/soil and one for q10/q90 '
+                             '(implies --shared-matrix)')
+    parser.add_argument('--feature-cache', default='feature_cache',
+                        help="feature cache directory ('' to always rebuild)")
+    parser.add_argument('--max-fill-steps', type=int, default=2,
+                        help='longest run of missing 5-minute slots to interpolate')
+    parser.add_argument('--no-resample', action='store_true',
+                        help='train on the raw readings instead of the 5-minute grid')
+    parser.add_argument('--chunked', action='store_true',
+                        help='load and featurize one node at a time in chunks and stream the '
+                             'cached matrices into XGBoost (implies --shared-matrix)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help='rows per feature chunk and per XGBoost batch with --chunked')
+    parser.add_argument('--external-memory', default=None, metavar='DIR',
+                        help="page XGBoost's binned matrix to DIR (implies --chunked)")
+    args = parser.parse_args()
+
+    print("="*80)
+    print("TRAINING EXTENDED HORIZON MODELS")
+    print("="*80)
+
+    start = time.perf_counter()
+    horizons = {h: HORIZON_STEPS[h] for h in args.horizons}
+    if args.chunked or args.external_memory:
+        models, quantile_models = train_chunked(args, horizons)
+        save_models(args, models, quantile_models, horizons)
+        print(f"✓ Training complete in {time.perf_counter() - start:.1f}s")
+        return
+
+    df = load_sensor_logs(node_ids=args.nodes, months=args.months)
+    node_ids = args.nodes or sorted(df['node_id'].unique())
+    print(f"✓ Loaded {len(df):,} records for {', '.join(node_ids)}")
+    if not args.no_resample:
+        df = resample_to_grid(df, max_fill_steps=args.max_fill_steps)
+        print(f"✓ Resampled to 5-minute grid: {describe_grid(df)}")
+    cache_dir = args.feature_cache or None
+
+    if args.shared_matrix or args.multi_output:
+        models, quantile_models = train_shared_matrix_models(
+            df, horizons, node_ids,
+            n_jobs=args.n_jobs, tree_method=args.tree_method, multi_output=args.multi_output,
+            cache_dir=cache_dir
+        )
+    else:
+        models, quantile_models = train_extended_horizon_models(
+            df, horizons, node_ids,
+            workers=args.workers, n_jobs=args.n_jobs, tree_method=args.tree_method,
+            cache_dir=cache_dir
+        )
+
+    save_models(args, models, quantile_models, horizons)
+    print(f"✓ Training complete in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()